@@ -0,0 +1,45 @@
+#!/usr/bin/env python3
+"""
+Create the clipboard indexes added after the initial schema.
+
+- ix_clipboard_item_expires_at: partial index for the expired-item cleanup
+- ix_clipboard_folder_user_parent_lower_name: folder tree listing order
+
+New databases get both from db.create_all(). The statements use
+IF NOT EXISTS, so the script can be run more than once.
+
+Usage:
+  DATABASE_URL=postgresql+psycopg://... python scripts/add_clipboard_indexes.py
+"""
+
+import os
+import sys
+
+from sqlalchemy import create_engine, text
+
+INDEXES = (
+    "CREATE INDEX IF NOT EXISTS ix_clipboard_item_expires_at "
+    "ON clipboard_item (expires_at) WHERE expires_at IS NOT NULL",
+    "CREATE INDEX IF NOT EXISTS ix_clipboard_folder_user_parent_lower_name "
+    "ON clipboard_folder (user_id, parent_id, lower(name))",
+)
+
+
+def get_database_url() -> str:
+    db_url = os.getenv("DATABASE_URL")
+    if not db_url:
+        raise SystemExit("DATABASE_URL is required to run this migration.")
+    return db_url
+
+
+def main() -> int:
+    engine = create_engine(get_database_url())
+    with engine.begin() as conn:
+        for statement in INDEXES:
+            conn.execute(text(statement))
+    print("Clipboard indexes are in place.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
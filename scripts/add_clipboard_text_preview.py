@@ -0,0 +1,40 @@
+#!/usr/bin/env python3
+"""
+Add the clipboard_item.text_preview column to an existing database.
+
+New databases get the column from db.create_all(). Rows written before the
+migration keep a NULL preview and are shown from their full content.
+
+Usage:
+  DATABASE_URL=postgresql+psycopg://... python scripts/add_clipboard_text_preview.py
+"""
+
+import os
+import sys
+
+from sqlalchemy import LargeBinary, create_engine, inspect, text
+
+
+def get_database_url() -> str:
+    db_url = os.getenv("DATABASE_URL")
+    if not db_url:
+        raise SystemExit("DATABASE_URL is required to run this migration.")
+    return db_url
+
+
+def main() -> int:
+    engine = create_engine(get_database_url())
+    columns = {column["name"] for column in inspect(engine).get_columns("clipboard_item")}
+    if "text_preview" in columns:
+        print("clipboard_item.text_preview already exists.")
+        return 0
+
+    column_type = LargeBinary().compile(dialect=engine.dialect)
+    with engine.begin() as conn:
+        conn.execute(text(f"ALTER TABLE clipboard_item ADD COLUMN text_preview {column_type}"))
+    print("Added clipboard_item.text_preview.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
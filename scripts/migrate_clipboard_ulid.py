@@ -8,6 +8,8 @@ Usage:
 
 import os
 import sys
+import time
+from itertools import islice
 
 import ulid
 from sqlalchemy import create_engine, text
@@ -20,10 +22,41 @@ def get_database_url() -> str:
     return db_url
 
 
+BATCH_SIZE = 1000
+
+
 def fetch_all(conn, query: str):
     return conn.execute(text(query)).mappings().all()
 
 
+def stream_rows(conn, query: str):
+    """Iterate rows through a server-side cursor, BATCH_SIZE rows at a time.
+
+    The options go on the statement: Connection.execution_options() would
+    switch every later execute on conn, including executemany INSERTs, to a
+    server-side cursor.
+    """
+    statement = text(query).execution_options(stream_results=True, yield_per=BATCH_SIZE)
+    return conn.execute(statement).mappings()
+
+
+def ulid_strings():
+    """Yield ULID strings, drawing randomness for a whole batch per os.urandom call."""
+    while True:
+        timestamp = int(time.time() * 1000).to_bytes(6, "big")
+        randomness = os.urandom(10 * BATCH_SIZE)
+        for offset in range(0, len(randomness), 10):
+            yield ulid.base32.encode_ulid(timestamp + randomness[offset : offset + 10])
+
+
+def insert_in_batches(conn, query: str, rows) -> None:
+    """Insert an iterable of parameter dicts with one executemany per batch."""
+    statement = text(query)
+    rows = iter(rows)
+    while batch := list(islice(rows, BATCH_SIZE)):
+        conn.execute(statement, batch)
+
+
 def main() -> int:
     db_url = get_database_url()
     engine = create_engine(db_url)
@@ -57,21 +90,9 @@ def main() -> int:
             FROM clipboard_folder
             """,
         )
-        items = fetch_all(
-            conn,
-            """
-            SELECT id, user_id, folder_id, name, content, content_type, is_text,
-                   size, favorite, created_at, updated_at, expires_at
-            FROM clipboard_item
-            """,
-        )
-        item_tags = fetch_all(
-            conn,
-            "SELECT item_id, tag_id FROM clipboard_item_tags",
-        )
-
-        folder_map = {row["id"]: str(ulid.new()) for row in folders}
-        item_map = {row["id"]: str(ulid.new()) for row in items}
+        new_ids = ulid_strings()
+        folder_map = {row["id"]: next(new_ids) for row in folders}
+        item_map: dict[int, str] = {}
 
         conn.execute(text("DROP TABLE IF EXISTS clipboard_item_tags_new"))
         conn.execute(text("DROP TABLE IF EXISTS clipboard_item_new"))
@@ -126,17 +147,19 @@ def main() -> int:
             )
         )
 
-        for row in folders:
-            conn.execute(
-                text(
-                    """
-                    INSERT INTO clipboard_folder_new (
-                        id, user_id, name, parent_id, created_at, updated_at
-                    ) VALUES (
-                        :id, :user_id, :name, :parent_id, :created_at, :updated_at
-                    )
-                    """
-                ),
+        # Folders are few and needed whole for parent lookups; items and tags
+        # are streamed and inserted in batches so clipboard content never has
+        # to fit in memory at once.
+        insert_in_batches(
+            conn,
+            """
+            INSERT INTO clipboard_folder_new (
+                id, user_id, name, parent_id, created_at, updated_at
+            ) VALUES (
+                :id, :user_id, :name, :parent_id, :created_at, :updated_at
+            )
+            """,
+            (
                 {
                     "id": folder_map[row["id"]],
                     "user_id": row["user_id"],
@@ -144,24 +167,23 @@ def main() -> int:
                     "parent_id": folder_map.get(row["parent_id"]),
                     "created_at": row["created_at"],
                     "updated_at": row["updated_at"],
-                },
-            )
+                }
+                for row in folders
+            ),
+        )
 
-        for row in items:
-            conn.execute(
-                text(
-                    """
-                    INSERT INTO clipboard_item_new (
-                        id, user_id, folder_id, name, content, content_type, is_text,
-                        size, favorite, created_at, updated_at, expires_at
-                    ) VALUES (
-                        :id, :user_id, :folder_id, :name, :content, :content_type, :is_text,
-                        :size, :favorite, :created_at, :updated_at, :expires_at
-                    )
-                    """
-                ),
-                {
-                    "id": item_map[row["id"]],
+        def migrated_items():
+            for row in stream_rows(
+                conn,
+                """
+                SELECT id, user_id, folder_id, name, content, content_type, is_text,
+                       size, favorite, created_at, updated_at, expires_at
+                FROM clipboard_item
+                """,
+            ):
+                item_map[row["id"]] = new_id = next(new_ids)
+                yield {
+                    "id": new_id,
                     "user_id": row["user_id"],
                     "folder_id": folder_map.get(row["folder_id"]),
                     "name": row["name"],
@@ -173,22 +195,34 @@ def main() -> int:
                     "created_at": row["created_at"],
                     "updated_at": row["updated_at"],
                     "expires_at": row["expires_at"],
-                },
-            )
+                }
 
-        for row in item_tags:
-            new_item_id = item_map.get(row["item_id"])
-            if not new_item_id:
-                continue
-            conn.execute(
-                text(
-                    """
-                    INSERT INTO clipboard_item_tags_new (item_id, tag_id)
-                    VALUES (:item_id, :tag_id)
-                    """
-                ),
-                {"item_id": new_item_id, "tag_id": row["tag_id"]},
+        insert_in_batches(
+            conn,
+            """
+            INSERT INTO clipboard_item_new (
+                id, user_id, folder_id, name, content, content_type, is_text,
+                size, favorite, created_at, updated_at, expires_at
+            ) VALUES (
+                :id, :user_id, :folder_id, :name, :content, :content_type, :is_text,
+                :size, :favorite, :created_at, :updated_at, :expires_at
             )
+            """,
+            migrated_items(),
+        )
+
+        insert_in_batches(
+            conn,
+            """
+            INSERT INTO clipboard_item_tags_new (item_id, tag_id)
+            VALUES (:item_id, :tag_id)
+            """,
+            (
+                {"item_id": item_map[row["item_id"]], "tag_id": row["tag_id"]}
+                for row in stream_rows(conn, "SELECT item_id, tag_id FROM clipboard_item_tags")
+                if row["item_id"] in item_map
+            ),
+        )
 
         conn.execute(text("DROP TABLE IF EXISTS clipboard_item_tags"))
         conn.execute(text("DROP TABLE IF EXISTS clipboard_item"))
@@ -4,18 +4,26 @@ Flask application factory and routes for ClipDrop - File Uploader & Clipboard Ma
 
 import logging
 import os
-import uuid
+import re
+import tempfile
 from collections import defaultdict
+from collections.abc import Callable, Iterable
+from contextlib import closing
 from datetime import datetime, timedelta
-from io import BytesIO
+from operator import attrgetter
 from pathlib import Path
+from typing import IO, Any, NamedTuple, cast
 
 from apscheduler.schedulers.background import BackgroundScheduler
 from dotenv import load_dotenv
 from flask import (
     Blueprint,
     Flask,
+    Request,
+    Response,
+    current_app,
     flash,
+    g,
     redirect,
     render_template,
     request,
@@ -25,28 +33,63 @@ from flask import (
 from flask_dance.consumer import oauth_authorized, oauth_error
 from flask_dance.contrib.github import make_github_blueprint
 from flask_login import current_user, login_required, login_user, logout_user
+from jinja2 import FileSystemBytecodeCache
+from sqlalchemy import and_, delete, func, select
+from sqlalchemy.dialects.postgresql import Insert as PostgresqlInsert
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import Insert as SqliteInsert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.engine import CursorResult, make_url
 from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import defer, selectinload
+from sqlalchemy.orm.attributes import set_committed_value
+from werkzeug.exceptions import HTTPException
+from werkzeug.http import is_resource_modified
 from werkzeug.middleware.proxy_fix import ProxyFix
 from werkzeug.utils import secure_filename
+from werkzeug.wsgi import FileWrapper
 
-from clipdrop.crypto import load_key_from_env
-from clipdrop.extensions import db, login_manager
+from clipdrop.crypto import STREAM_CHUNK_SIZE, load_key_from_env, openssl_version
+from clipdrop.extensions import ORJSONProvider, db, login_manager, orjson
 from clipdrop.helpers import (
     ALLOWED_EXTENSIONS,
+    CLIPBOARD_PREVIEW_CHARS,
+    MAX_STORED_FILENAME_LENGTH,
     MIMETYPE_MAP,
     OAUTH_ERROR_MESSAGES,
+    PREVIEW_EXTENSIONS,
+    PREVIEW_SIZE,
     allowed_file,
     calculate_expiry,
     decrypt_data_safe,
+    decrypt_stream_safe,
     encrypt_data_safe,
+    encrypt_stream_safe,
     get_file_extension,
     get_oauth_error_message,
+    hashing_stream,
     human_readable_size,
+    is_stored_filename,
     json_error,
     json_success,
+    open_decrypted_reader,
+    truncate_filename,
 )
-from clipdrop.models import ClipboardFolder, ClipboardItem, ClipboardTag, OAuth, User
-from clipdrop.storage import get_storage, init_storage
+from clipdrop.models import (
+    ClipboardFolder,
+    ClipboardItem,
+    ClipboardTag,
+    OAuth,
+    User,
+    clipboard_item_tags,
+    generate_ulid,
+)
+from clipdrop.storage import StorageFile, get_storage, init_storage
+
+try:
+    import fcntl
+except ImportError:  # Windows has no flock; every process runs its own scheduler
+    fcntl = None  # type: ignore[assignment]
 
 # Load environment variables
 load_dotenv()
@@ -60,8 +103,32 @@ if os.getenv("FLASK_ENV") == "development" and os.getenv("FLASK_DEBUG", "").lowe
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-# Global encryption key (loaded once)
-_encryption_key = None
+# Dialect-specific INSERT constructs that support ON CONFLICT DO NOTHING
+UPSERT_INSERTS: dict[str, Callable[..., PostgresqlInsert | SqliteInsert]] = {
+    "postgresql": postgresql_insert,
+    "sqlite": sqlite_insert,
+}
+
+
+class UploadRequest(Request):
+    """Request that spools multipart file parts into UPLOAD_TEMP_DIR.
+
+    Parts known to exceed UPLOAD_SPOOL_SIZE go straight to a temporary file
+    instead of being buffered in memory and copied out on rollover.
+    """
+
+    def _get_file_stream(
+        self,
+        total_content_length: int | None,
+        content_type: str | None,
+        filename: str | None = None,
+        content_length: int | None = None,
+    ) -> IO[bytes]:
+        spool_size = current_app.config["UPLOAD_SPOOL_SIZE"]
+        temp_dir = current_app.config["UPLOAD_TEMP_DIR"]
+        if total_content_length is not None and total_content_length > spool_size:
+            return tempfile.TemporaryFile("rb+", dir=temp_dir)
+        return tempfile.SpooledTemporaryFile(max_size=spool_size, mode="rb+", dir=temp_dir)
 
 
 @login_manager.user_loader
@@ -69,20 +136,50 @@ def load_user(user_id):
     return db.session.get(User, int(user_id))
 
 
-def get_encryption_key():
-    """Get the encryption key, loading it if necessary."""
-    global _encryption_key
-    if _encryption_key is None:
-        encryption_key_b64 = os.getenv("ENCRYPTION_KEY")
-        if encryption_key_b64:
-            try:
-                _encryption_key = load_key_from_env(encryption_key_b64)
-                logger.info("Encryption key loaded successfully")
-            except Exception as e:
-                logger.warning(f"Failed to load encryption key: {e}. Files will not be encrypted.")
-        else:
-            logger.warning("ENCRYPTION_KEY not set. Files will be stored unencrypted.")
-    return _encryption_key
+def engine_options(database_url: str) -> dict[str, Any]:
+    """Connection pool settings for the configured database.
+
+    SQLite keeps SQLAlchemy's defaults; server databases get a larger pool
+    that checks connections before use and recycles them before the server
+    or a proxy drops them. DB_POOL_PRE_PING=0 skips the check-out ping on
+    networks where idle connections are not cut; a connection that does
+    drop then fails one request and the pool is invalidated.
+    """
+    url = make_url(database_url)
+    if url.get_backend_name() == "sqlite":
+        return {}
+    options: dict[str, Any] = {
+        "pool_size": int(os.getenv("DB_POOL_SIZE", "10")),
+        "max_overflow": int(os.getenv("DB_MAX_OVERFLOW", "20")),
+        "pool_timeout": 30,
+        "pool_recycle": 1800,
+        "pool_pre_ping": os.getenv("DB_POOL_PRE_PING", "1").lower() not in ("0", "false", "no"),
+    }
+    if url.get_driver_name() == "psycopg2":
+        # Batch executemany() UPDATE/DELETE statements as well as INSERTs
+        options["executemany_mode"] = "values_plus_batch"
+    return options
+
+
+def load_encryption_key() -> bytes | None:
+    """Load the encryption key from the environment, logging the outcome once."""
+    encryption_key_b64 = os.getenv("ENCRYPTION_KEY")
+    if not encryption_key_b64:
+        logger.warning("ENCRYPTION_KEY not set. Files will be stored unencrypted.")
+        return None
+    try:
+        key = load_key_from_env(encryption_key_b64)
+    except Exception as e:
+        logger.warning(f"Failed to load encryption key: {e}. Files will not be encrypted.")
+        return None
+    logger.info(f"Encryption key loaded successfully (AES-256-GCM via {openssl_version()})")
+    return key
+
+
+def get_encryption_key() -> bytes | None:
+    """Get the encryption key resolved when the app was created."""
+    key: bytes | None = current_app.config["ENCRYPTION_KEY"]
+    return key
 
 
 def create_app(config=None):
@@ -95,6 +192,7 @@ def create_app(config=None):
         template_folder=str(package_dir / "templates"),
         static_folder=str(package_dir / "static"),
     )
+    app.request_class = UploadRequest
 
     # Apply ProxyFix to handle reverse proxy headers (X-Forwarded-Proto, X-Forwarded-For, etc.)
     # This ensures OAuth redirects use https:// when behind a proxy like nginx or Cloudflare
@@ -112,6 +210,19 @@ def create_app(config=None):
     app.config["UPLOAD_FOLDER"] = os.getenv("UPLOAD_FOLDER", "uploads")
     app.config["CLIPBOARD_FOLDER"] = os.getenv("CLIPBOARD_FOLDER", "clipboard")
     app.config["MAX_CONTENT_LENGTH"] = 10 * 1024 * 1024 * 1024  # 10GB
+    # Multipart file parts larger than this are spooled to disk (default: system temp dir)
+    app.config["UPLOAD_SPOOL_SIZE"] = 1024 * 1024
+    app.config["UPLOAD_TEMP_DIR"] = os.getenv("UPLOAD_TEMP_DIR") or None
+    # Internal nginx location aliasing UPLOAD_FOLDER, e.g. "/_internal_uploads"
+    app.config["X_ACCEL_REDIRECT_PREFIX"] = os.getenv("X_ACCEL_REDIRECT_PREFIX", "")
+    # Set RUN_SCHEDULER=0 on all but one replica when running several hosts
+    app.config["RUN_SCHEDULER"] = os.getenv("RUN_SCHEDULER", "1").lower() not in (
+        "0",
+        "false",
+        "no",
+    )
+    if os.getenv("SCHEDULER_LOCK_FILE"):
+        app.config["SCHEDULER_LOCK_FILE"] = os.getenv("SCHEDULER_LOCK_FILE")
 
     # Session security configuration for production
     is_production = os.getenv("FLASK_ENV") != "development"
@@ -125,10 +236,30 @@ def create_app(config=None):
     app.config["SQLALCHEMY_DATABASE_URI"] = database_url
     app.config["SQLALCHEMY_TRACK_MODIFICATIONS"] = False
 
+    app.config["ENCRYPTION_KEY"] = load_encryption_key()
+
     # Apply any additional configuration
     if config:
         app.config.update(config)
 
+    app.config.setdefault(
+        "SQLALCHEMY_ENGINE_OPTIONS", engine_options(app.config["SQLALCHEMY_DATABASE_URI"])
+    )
+    # Per upload folder, so separate instances on one host each elect a scheduler
+    app.config.setdefault(
+        "SCHEDULER_LOCK_FILE", os.path.join(app.config["UPLOAD_FOLDER"], ".scheduler.lock")
+    )
+
+    # Templates only change on deploy in production: skip per-render mtime checks
+    # and reuse compiled template bytecode across workers and restarts
+    if is_production:
+        app.config["TEMPLATES_AUTO_RELOAD"] = False
+        app.jinja_env.auto_reload = False
+        app.jinja_env.bytecode_cache = FileSystemBytecodeCache()
+
+    if orjson is not None:
+        app.json = ORJSONProvider(app)
+
     db.init_app(app)
     login_manager.init_app(app)
     login_manager.login_view = "auth.login"
@@ -233,62 +364,119 @@ def register_auth(app):
         username = github_info.get("login", "github-user")
         avatar_url = github_info.get("avatar_url")
 
-        oauth = OAuth.query.filter_by(
-            provider=blueprint.name,
-            provider_user_id=github_user_id,
-        ).first()
-        user = User.query.filter_by(github_id=github_user_id).first()
-
-        try:
-            if user is None:
-                user = User(
-                    github_id=github_user_id,
-                    username=username,
-                    avatar_url=avatar_url,
-                )
-                db.session.add(user)
-            else:
-                user.username = username
-                user.avatar_url = avatar_url
-
-            if oauth is None:
-                oauth = OAuth(
-                    provider=blueprint.name,
-                    provider_user_id=github_user_id,
-                    token=token,
-                    user=user,
-                )
-                db.session.add(oauth)
-            else:
-                oauth.token = token
-                oauth.user = user
-
-            db.session.commit()
-        except IntegrityError:
-            db.session.rollback()
-            user = User.query.filter_by(github_id=github_user_id).first()
-            oauth = OAuth.query.filter_by(
-                provider=blueprint.name,
-                provider_user_id=github_user_id,
-            ).first()
-            if user and oauth:
-                oauth.user = user
-                oauth.token = token
-                user.username = username
-                user.avatar_url = avatar_url
-                db.session.commit()
-            else:
-                flash("Sign in failed. Please try again.", "danger")
-                return False
+        user = save_github_account(blueprint.name, github_user_id, username, avatar_url, token)
+        if user is None:
+            flash("Sign in failed. Please try again.", "danger")
+            return False
 
         login_user(user)
         flash("Signed in with GitHub.", "success")
         return False
 
 
+def save_github_account(
+    provider: str, github_user_id: str, username: str, avatar_url: str | None, token: dict
+) -> User | None:
+    """Create or update a GitHub user and their OAuth token.
+
+    Uses one INSERT ... ON CONFLICT DO UPDATE per table where the database
+    supports it. Returns None if the account could not be saved.
+    """
+    insert = UPSERT_INSERTS.get(db.session.get_bind().dialect.name)
+    if insert is None:
+        return _save_github_account_orm(provider, github_user_id, username, avatar_url, token)
+
+    stmt = insert(User).values(github_id=github_user_id, username=username, avatar_url=avatar_url)
+    user = db.session.scalars(
+        stmt.on_conflict_do_update(
+            index_elements=[User.github_id],
+            set_={"username": stmt.excluded.username, "avatar_url": stmt.excluded.avatar_url},
+        ).returning(User),
+        execution_options={"populate_existing": True},
+    ).one()
+    stmt = insert(OAuth).values(
+        provider=provider, provider_user_id=github_user_id, token=token, user_id=user.id
+    )
+    db.session.execute(
+        stmt.on_conflict_do_update(
+            index_elements=[OAuth.provider, OAuth.provider_user_id],
+            set_={"token": stmt.excluded.token, "user_id": stmt.excluded.user_id},
+        )
+    )
+    db.session.commit()
+    return user
+
+
+def _save_github_account_orm(
+    provider: str, github_user_id: str, username: str, avatar_url: str | None, token: dict
+) -> User | None:
+    """Portable fallback for databases without INSERT ... ON CONFLICT."""
+    user, oauth = find_github_account(provider, github_user_id)
+
+    try:
+        if user is None:
+            user = User(
+                github_id=github_user_id,
+                username=username,
+                avatar_url=avatar_url,
+            )
+            db.session.add(user)
+        else:
+            user.username = username
+            user.avatar_url = avatar_url
+
+        if oauth is None:
+            oauth = OAuth(
+                provider=provider,
+                provider_user_id=github_user_id,
+                token=token,
+                user=user,
+            )
+            db.session.add(oauth)
+        else:
+            oauth.token = token
+            oauth.user = user
+
+        db.session.commit()
+    except IntegrityError:
+        db.session.rollback()
+        user, oauth = find_github_account(provider, github_user_id)
+        if user and oauth:
+            oauth.user = user
+            oauth.token = token
+            user.username = username
+            user.avatar_url = avatar_url
+            db.session.commit()
+        else:
+            return None
+    return user
+
+
+def find_github_account(provider: str, github_user_id: str) -> tuple[User | None, OAuth | None]:
+    """Load a GitHub user and their OAuth link in a single query."""
+    row = db.session.execute(
+        select(User, OAuth)
+        .outerjoin(
+            OAuth,
+            and_(
+                OAuth.provider == provider,
+                OAuth.provider_user_id == github_user_id,
+            ),
+        )
+        .where(User.github_id == github_user_id)
+    ).first()
+    return (row[0], row[1]) if row else (None, None)
+
+
 def register_routes(app):
     """Register all application routes."""
 
+    @app.before_request
+    def cache_user_id() -> None:
+        # Resolve the login proxy once per request; views filter on g.uid
+        if request.endpoint != "static":
+            g.uid = current_user.id if current_user.is_authenticated else None
+
     @app.route("/", methods=["GET", "POST"])
     @login_required
     def upload_file():
@@ -310,17 +498,31 @@ def register_routes(app):
                     400,
                     request.url,
                 )
-            if file and allowed_file(file.filename):
-                filename = secure_filename(file.filename)
-                filename = f"{uuid.uuid4()}_{filename}"
+            filename = secure_filename(file.filename)
+            if file and allowed_file(filename):
+                # Keep the stored name within filesystem limits and the
+                # pattern is_stored_filename accepts on the way back out
+                prefix = f"{generate_ulid()}_"
+                max_length = MAX_STORED_FILENAME_LENGTH - len(prefix)
+                filename = prefix + truncate_filename(filename, max_length)
                 try:
-                    file_data = file.read()
-                    encrypted_data = encrypt_data_safe(file_data, get_encryption_key())
                     storage = get_storage()
-                    storage.save(filename, encrypted_data, content_type=file.mimetype)
+                    encryption_key = get_encryption_key()
+                    source, content_digest = file.stream, None
+                    if storage.deduplicates:
+                        # Hash the plaintext in the same pass as encryption so
+                        # identical uploads can share one stored copy
+                        source, hasher = hashing_stream(source, encryption_key)
+                        content_digest = hasher.hexdigest
+                    storage.save_stream(
+                        filename,
+                        encrypt_stream_safe(source, encryption_key),
+                        content_type=file.mimetype,
+                        content_digest=content_digest,
+                    )
                     logger.info(
                         f"File {filename} successfully uploaded "
-                        f"(encrypted: {get_encryption_key() is not None})"
+                        f"(encrypted: {encryption_key is not None})"
                     )
                     return respond_upload(
                         "File successfully uploaded.",
@@ -346,11 +548,14 @@ def register_routes(app):
                 )
 
         storage = get_storage()
-        files = [get_file_properties(f) for f in storage.list_files()]
+        # Stored names start with a ULID, so name order is upload order
+        stored = sorted(storage.list_files(), key=attrgetter("key"), reverse=True)
+        files = [get_file_properties(f) for f in stored]
         return render_template(
             "index.html",
             files=files,
             allowed_extensions=ALLOWED_EXTENSIONS,
+            preview_extensions=PREVIEW_EXTENSIONS,
             active_page="files",
         )
 
@@ -358,26 +563,114 @@ def register_routes(app):
     @login_required
     def uploaded_file(filename):
         """Serve uploaded file, decrypting if necessary."""
-        filename = secure_filename(filename)
+        if not is_stored_filename(filename):
+            return json_error("File not found", 404)
         storage = get_storage()
-        if not storage.exists(filename):
+        info = storage.get_file_info(filename)
+        if info is None:
             return json_error("File not found", 404)
 
         try:
-            encrypted_data = storage.read(filename)
-            data = decrypt_data_safe(encrypted_data, get_encryption_key())
             ext = get_file_extension(filename)
             mimetype = MIMETYPE_MAP.get(ext, "application/octet-stream")
-            return send_file(BytesIO(data), mimetype=mimetype, download_name=filename)
+            encryption_key = get_encryption_key()
+            local_path = storage.local_path(filename)
+            if encryption_key is None and local_path:
+                accel_prefix = app.config["X_ACCEL_REDIRECT_PREFIX"]
+                if accel_prefix:
+                    # Hand the transfer to nginx so it never passes through Python
+                    response = Response(mimetype=mimetype)
+                    response.headers["X-Accel-Redirect"] = f"{accel_prefix.rstrip('/')}/{filename}"
+                    response.headers.set("Content-Disposition", "inline", filename=filename)
+                    return response
+                # Plaintext on disk: let the WSGI server send it (sendfile, Range)
+                return send_file(
+                    local_path, mimetype=mimetype, download_name=filename, conditional=True
+                )
+
+            # Stored files are never rewritten, so size and timestamp identify
+            # the content; revalidations are answered before anything is decrypted
+            etag = f"{info.size:x}-{info.last_modified.timestamp():.6f}"
+            if not is_resource_modified(
+                request.environ, etag=etag, last_modified=info.last_modified
+            ):
+                response = Response(status=304)
+                response.set_etag(etag)
+                return response
+
+            stream = storage.open(filename)
+            try:
+                reader = open_decrypted_reader(stream, encryption_key, info.size)
+                if reader is not None:
+                    # Seekable records: Range requests only decrypt what they cover.
+                    # werkzeug's FileWrapper, not the server's wsgi.file_wrapper:
+                    # gunicorn's cannot seek, so ranges would decrypt from byte 0
+                    response = Response(
+                        FileWrapper(reader, STREAM_CHUNK_SIZE),
+                        mimetype=mimetype,
+                        direct_passthrough=True,
+                    )
+                    response.content_length = reader.size
+                else:
+                    chunks = decrypt_stream_safe(stream, encryption_key)
+                    response = Response(chunks, mimetype=mimetype)
+                    response.call_on_close(stream.close)
+            except Exception:
+                stream.close()
+                raise
+            response.headers.set("Content-Disposition", "inline", filename=filename)
+            response.set_etag(etag)
+            response.last_modified = info.last_modified
+            if reader is None:
+                return response
+            try:
+                return response.make_conditional(
+                    request, accept_ranges=True, complete_length=reader.size
+                )
+            except HTTPException:
+                reader.close()  # Unsatisfiable range
+                raise
+        except HTTPException:
+            raise
         except Exception as e:
             logger.error(f"Failed to serve file {filename}: {e}")
             return json_error("Failed to read file", 500)
 
+    @app.route("/uploads/<filename>/preview")
+    @login_required
+    def uploaded_file_preview(filename):
+        """Return the beginning of a text upload for inline preview."""
+        if not is_stored_filename(filename):
+            return json_error("File not found", 404)
+        if get_file_extension(filename) not in PREVIEW_EXTENSIONS:
+            return json_error("Preview not available for this file type", 400)
+        storage = get_storage()
+
+        head = bytearray()
+        try:
+            with closing(storage.open(filename)) as stream:
+                # Only the chunks covering the preview are read and decrypted
+                for chunk in decrypt_stream_safe(stream, get_encryption_key()):
+                    head += chunk
+                    if len(head) > PREVIEW_SIZE:
+                        break
+        except FileNotFoundError:
+            return json_error("File not found", 404)
+        except Exception as e:
+            logger.error(f"Failed to preview file {filename}: {e}")
+            return json_error("Failed to read file", 500)
+
+        return json_success(
+            "Preview loaded",
+            content=head[:PREVIEW_SIZE].decode("utf-8", errors="replace"),
+            truncated=len(head) > PREVIEW_SIZE,
+        )
+
     @app.route("/clipboard/<item_id>")
     @login_required
     def clipboard_file(item_id):
         """View clipboard content."""
-        item = ClipboardItem.query.filter_by(id=item_id, user_id=current_user.id).first()
+        item = ClipboardItem.query.filter_by(id=item_id, user_id=g.uid).first()
         if not item:
             return render_template(
                 "clipboard_view.html", item=None, is_text=False, active_page="clipboard"
@@ -395,17 +688,28 @@ def register_routes(app):
     @login_required
     def clipboard_file_raw(item_id):
         """Serve raw clipboard content for download."""
-        item = ClipboardItem.query.filter_by(id=item_id, user_id=current_user.id).first()
+        # The content column is only loaded once the client's copy is known stale
+        item = (
+            ClipboardItem.query.options(defer(ClipboardItem.content))
+            .filter_by(id=item_id, user_id=g.uid)
+            .first()
+        )
         if not item:
             return json_error("Item not found", 404)
 
+        etag = f"{item.id}-{item.updated_at.timestamp():.6f}"
+        if not is_resource_modified(request.environ, etag=etag):
+            response = Response(status=304)
+            response.set_etag(etag)
+            return response
+
         try:
             data = decrypt_data_safe(item.content, get_encryption_key())
-            return send_file(
-                BytesIO(data),
-                mimetype=item.content_type or "application/octet-stream",
-                download_name=item.name,
-            )
+            # Already in memory: a plain body gets a Content-Length and one write
+            response = Response(data, mimetype=item.content_type or "application/octet-stream")
+            response.headers.set("Content-Disposition", "inline", filename=item.name)
+            response.set_etag(etag)
+            return response
         except Exception as e:
             logger.error(f"Failed to serve clipboard item {item_id}: {e}")
             return json_error("Failed to read item", 500)
@@ -417,25 +721,22 @@ def register_routes(app):
         current_folder = None
         breadcrumbs = []
         if folder_id:
-            current_folder = ClipboardFolder.query.filter_by(
-                id=folder_id, user_id=current_user.id
-            ).first()
+            current_folder = ClipboardFolder.query.filter_by(id=folder_id, user_id=g.uid).first()
             if not current_folder:
                 flash("Folder not found.", "warning")
                 return redirect(url_for("shared_clipboard"))
             breadcrumbs = build_folder_breadcrumbs(current_folder)
 
         subfolders = (
-            ClipboardFolder.query.filter_by(user_id=current_user.id, parent_id=folder_id)
+            ClipboardFolder.query.filter_by(user_id=g.uid, parent_id=folder_id)
             .order_by(ClipboardFolder.name.asc())
             .all()
         )
-        items = (
-            ClipboardItem.query.filter_by(user_id=current_user.id, folder_id=folder_id)
-            .order_by(ClipboardItem.created_at.desc())
-            .all()
+        clipboard_items = serialize_clipboard_items(
+            ClipboardItem.query.filter_by(user_id=g.uid, folder_id=folder_id).order_by(
+                ClipboardItem.created_at.desc()
+            )
         )
-        clipboard_items = [serialize_clipboard_item(item) for item in items]
         return render_template(
             "shared_clipboard.html",
             clipboard_items=clipboard_items,
@@ -450,9 +751,7 @@ def register_routes(app):
     def clipboard():
         folder_id = request.form.get("folder_id") or None
         if folder_id:
-            folder = ClipboardFolder.query.filter_by(
-                id=folder_id, user_id=current_user.id
-            ).first()
+            folder = ClipboardFolder.query.filter_by(id=folder_id, user_id=g.uid).first()
             if not folder:
                 return json_error("Folder not found", 404)
 
@@ -463,10 +762,12 @@ def register_routes(app):
 
         if "image" in request.files and request.files["image"].filename:
             file = request.files["image"]
-            if not allowed_file(file.filename):
-                return json_error("File type not allowed", 400)
             filename = secure_filename(file.filename)
-            name = f"clipboard_{uuid.uuid4()}_{filename}" if filename else f"clipboard_{uuid.uuid4()}"
+            if not allowed_file(filename):
+                return json_error("File type not allowed", 400)
+            name = f"clipboard_{generate_ulid()}"
+            if filename:
+                name = f"{name}_{filename}"
             raw_data = file.read()
             content_type = file.mimetype or "application/octet-stream"
             is_text = False
@@ -475,30 +776,57 @@ def register_routes(app):
             if not data:
                 return json_error("Clipboard text is required", 400)
             raw_data = data.encode("utf-8")
-            name = f"clipboard_{uuid.uuid4()}.txt"
+            name = f"clipboard_{generate_ulid()}.txt"
             content_type = "text/plain"
             is_text = True
 
         item = ClipboardItem(
-            user_id=current_user.id,
+            user_id=g.uid,
             folder_id=folder_id,
             name=name,
             content=encrypt_data_safe(raw_data, get_encryption_key()),
+            text_preview=build_text_preview(data) if is_text else None,
             content_type=content_type,
             is_text=is_text,
             size=len(raw_data),
             favorite=favorite,
             expires_at=expires_at,
         )
-        item.tags = get_or_create_tags(tags, current_user.id)
+        item.tags = get_or_create_tags(tags, g.uid)
         db.session.add(item)
         db.session.commit()
         return json_success("Saved", id=item.id)
 
+    @app.route("/clipboard/folder-options.json")
+    @login_required
+    def clipboard_folder_options():
+        """Return the folder select options, revalidated with an ETag."""
+        count, last_updated = db.session.execute(
+            select(func.count(ClipboardFolder.id), func.max(ClipboardFolder.updated_at)).where(
+                ClipboardFolder.user_id == g.uid
+            )
+        ).one()
+        # Renames and moves bump updated_at; creates and deletes change the count
+        etag = f"{count:x}-{last_updated.timestamp() if last_updated else 0:.6f}"
+        if not is_resource_modified(request.environ, etag=etag):
+            response = Response(status=304)
+            response.set_etag(etag)
+            return response
+
+        response = json_success("Folder options loaded", folders=build_folder_options(g.uid))
+        response.set_etag(etag)
+        response.cache_control.private = True
+        response.cache_control.no_cache = True
+        return response
+
     @app.route("/clipboard/<item_id>/edit", methods=["GET", "POST"])
     @login_required
     def edit_clipboard_item(item_id):
-        item = ClipboardItem.query.filter_by(id=item_id, user_id=current_user.id).first()
+        item = (
+            ClipboardItem.query.options(selectinload(ClipboardItem.tags))
+            .filter_by(id=item_id, user_id=g.uid)
+            .first()
+        )
         if not item:
             flash("Clipboard item not found.", "warning")
             return redirect(url_for("shared_clipboard"))
@@ -508,9 +836,7 @@ def register_routes(app):
             name = normalize_clipboard_name(name, item.name, item.is_text)
             folder_id = request.form.get("folder_id") or None
             if folder_id:
-                folder = ClipboardFolder.query.filter_by(
-                    id=folder_id, user_id=current_user.id
-                ).first()
+                folder = ClipboardFolder.query.filter_by(id=folder_id, user_id=g.uid).first()
                 if not folder:
                     flash("Folder not found.", "warning")
                     return redirect(url_for("edit_clipboard_item", item_id=item_id))
@@ -523,13 +849,14 @@ def register_routes(app):
                 content_text = request.form.get("content", "")
                 raw_data = content_text.encode("utf-8")
                 item.content = encrypt_data_safe(raw_data, get_encryption_key())
+                item.text_preview = build_text_preview(content_text)
                 item.size = len(raw_data)
 
             item.name = name
             item.folder_id = folder_id
             item.favorite = favorite
             item.expires_at = calculate_expiry(keep)
-            item.tags = get_or_create_tags(tags, current_user.id)
+            item.tags = get_or_create_tags(tags, g.uid)
 
             db.session.commit()
             flash("Clipboard item updated.", "success")
@@ -545,7 +872,11 @@ def register_routes(app):
             "clipboard_edit.html",
             item=item,
             content_text=content_text,
-            folder_options=build_folder_options(current_user.id),
+            # The folder list is fetched from clipboard_folder_options when
+            # the select is opened, unless the page is asked to inline it
+            folder_options=(
+                build_folder_options(g.uid) if request.args.get("folders") == "1" else None
+            ),
             tags_value=", ".join(tag.name for tag in item.tags),
             active_page="clipboard",
         )
@@ -553,22 +884,26 @@ def register_routes(app):
     @app.route("/delete/<path:filename>", methods=["DELETE", "POST"])
     @login_required
     def delete_file(filename):
-        filename = secure_filename(filename)
-        storage = get_storage()
-        if storage.exists(filename):
-            try:
-                storage.delete(filename)
-                logger.info(f"File {filename} deleted by user")
-                return json_success("File deleted")
-            except Exception as e:
-                logger.error(f"Failed to delete file {filename}: {e}")
-                return json_error("Failed to delete file", 500)
-        return json_error("File not found", 404)
+        if not is_stored_filename(filename):
+            return json_error("File not found", 404)
+        try:
+            deleted = get_storage().delete(filename)
+        except Exception as e:
+            logger.error(f"Failed to delete file {filename}: {e}")
+            return json_error("Failed to delete file", 500)
+        if not deleted:
+            return json_error("File not found", 404)
+        logger.info(f"File {filename} deleted by user")
+        return json_success("File deleted")
 
     @app.route("/clipboard/<item_id>/delete", methods=["POST"])
     @login_required
     def delete_clipboard_item(item_id):
-        item = ClipboardItem.query.filter_by(id=item_id, user_id=current_user.id).first()
+        item = (
+            ClipboardItem.query.options(defer(ClipboardItem.content))
+            .filter_by(id=item_id, user_id=g.uid)
+            .first()
+        )
         if not item:
             return json_error("Clipboard item not found", 404)
         db.session.delete(item)
@@ -578,7 +913,11 @@ def register_routes(app):
     @app.route("/clipboard/<item_id>/favorite", methods=["POST"])
     @login_required
     def toggle_clipboard_favorite(item_id):
-        item = ClipboardItem.query.filter_by(id=item_id, user_id=current_user.id).first()
+        item = (
+            ClipboardItem.query.options(defer(ClipboardItem.content))
+            .filter_by(id=item_id, user_id=g.uid)
+            .first()
+        )
         if not item:
             return json_error("Clipboard item not found", 404)
         payload = request.get_json(silent=True) or {}
@@ -592,7 +931,11 @@ def register_routes(app):
     @app.route("/clipboard/<item_id>/retention", methods=["POST"])
     @login_required
     def toggle_clipboard_retention(item_id):
-        item = ClipboardItem.query.filter_by(id=item_id, user_id=current_user.id).first()
+        item = (
+            ClipboardItem.query.options(defer(ClipboardItem.content))
+            .filter_by(id=item_id, user_id=g.uid)
+            .first()
+        )
         if not item:
             return json_error("Clipboard item not found", 404)
         payload = request.get_json(silent=True) or {}
@@ -611,13 +954,11 @@ def register_routes(app):
             return json_error("Folder name is required", 400)
         parent_id = request.form.get("parent_id") or None
         if parent_id:
-            parent = ClipboardFolder.query.filter_by(
-                id=parent_id, user_id=current_user.id
-            ).first()
+            parent = ClipboardFolder.query.filter_by(id=parent_id, user_id=g.uid).first()
             if not parent:
                 return json_error("Parent folder not found", 404)
 
-        folder = ClipboardFolder(user_id=current_user.id, name=name, parent_id=parent_id)
+        folder = ClipboardFolder(user_id=g.uid, name=name, parent_id=parent_id)
         db.session.add(folder)
         try:
             db.session.commit()
@@ -629,7 +970,7 @@ def register_routes(app):
     @app.route("/clipboard/folders/<folder_id>/rename", methods=["POST"])
     @login_required
     def rename_clipboard_folder(folder_id):
-        folder = ClipboardFolder.query.filter_by(id=folder_id, user_id=current_user.id).first()
+        folder = ClipboardFolder.query.filter_by(id=folder_id, user_id=g.uid).first()
         if not folder:
             return json_error("Folder not found", 404)
         payload = request.get_json(silent=True) or {}
@@ -647,7 +988,7 @@ def register_routes(app):
     @app.route("/clipboard/folders/<folder_id>/delete", methods=["POST"])
     @login_required
     def delete_clipboard_folder(folder_id):
-        folder = ClipboardFolder.query.filter_by(id=folder_id, user_id=current_user.id).first()
+        folder = ClipboardFolder.query.filter_by(id=folder_id, user_id=g.uid).first()
         if not folder:
             return json_error("Folder not found", 404)
         if folder.children or folder.items:
@@ -674,25 +1015,78 @@ def setup_scheduler(app):
 
         # Clean up expired clipboard items from database
         with app.app_context():
-            expired_items = (
-                ClipboardItem.query.filter(ClipboardItem.expires_at.isnot(None))
-                .filter(ClipboardItem.expires_at <= now)
-                .all()
-            )
-            if expired_items:
-                for item in expired_items:
-                    db.session.delete(item)
-                db.session.commit()
-                logger.info(f"Cleaned up {len(expired_items)} expired clipboard items")
+            deleted_items = delete_expired_clipboard_items(now)
+            if deleted_items:
+                logger.info(f"Cleaned up {deleted_items} expired clipboard items")
+
+    if not app.config["RUN_SCHEDULER"]:
+        logger.info("Cleanup scheduler disabled by RUN_SCHEDULER")
+        return
 
-    scheduler = BackgroundScheduler()
+    # Every gunicorn worker runs create_app(); only the one holding the lock
+    # schedules cleanup so workers do not race each other over the same files
+    if not acquire_scheduler_lock(app):
+        logger.info("Cleanup scheduler is running in another process")
+        return
+
+    # Missed or overlapping runs collapse into a single cleanup, and a run
+    # delayed by a busy or suspended process still happens within the hour
+    scheduler = BackgroundScheduler(
+        job_defaults={"coalesce": True, "max_instances": 1, "misfire_grace_time": 3600}
+    )
     scheduler.add_job(func=cleanup_files, trigger="interval", hours=24)
     scheduler.start()
 
 
+def acquire_scheduler_lock(app: Flask) -> bool:
+    """Try to take the process-wide cleanup scheduler lock without blocking."""
+    if fcntl is None:
+        return True
+    lock_path = app.config["SCHEDULER_LOCK_FILE"]
+    try:
+        os.makedirs(os.path.dirname(lock_path) or ".", exist_ok=True)
+        lock_file = open(lock_path, "w")
+    except OSError as e:
+        # Better every worker cleaning up than none; cleanup tolerates races
+        logger.warning(f"Cannot open scheduler lock file {lock_path}, running anyway: {e}")
+        return True
+    try:
+        fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except OSError:
+        lock_file.close()
+        return False
+    # Keep the handle open; the lock is released when this process exits
+    app.extensions["clipdrop_scheduler_lock"] = lock_file
+    return True
+
+
 # Helper functions
 
 
+def delete_expired_clipboard_items(now: datetime) -> int:
+    """Delete clipboard items that expired before now. Returns the number deleted.
+
+    Uses two bulk DELETEs: tag links first, since the association table has
+    no ON DELETE CASCADE, then the items themselves.
+    """
+    expired_ids = select(ClipboardItem.id).where(
+        ClipboardItem.expires_at.isnot(None),
+        ClipboardItem.expires_at <= now,
+    )
+    db.session.execute(
+        delete(clipboard_item_tags).where(clipboard_item_tags.c.item_id.in_(expired_ids))
+    )
+    result = cast(
+        CursorResult,
+        db.session.execute(
+            delete(ClipboardItem).where(ClipboardItem.id.in_(expired_ids)),
+            execution_options={"synchronize_session": False},
+        ),
+    )
+    db.session.commit()
+    return result.rowcount
+
+
 def wants_json_response():
     """Check if the request wants a JSON response."""
     return request.headers.get("X-Requested-With") == "XMLHttpRequest"
@@ -708,16 +1102,16 @@ def respond_upload(message, category, status, redirect_url):
     return redirect(redirect_url)
 
 
+_TAG_SEPARATOR = re.compile(r"\s*,\s*")
+
+
 def parse_tag_names(raw_tags: str) -> list[str]:
     """Parse a comma-separated tag string into normalized tag names."""
     if not raw_tags:
         return []
-    tags = []
-    for raw in raw_tags.split(","):
-        name = raw.strip()
-        if name:
-            tags.append(name.lower())
-    return list(dict.fromkeys(tags))
+    # Lowercase once and let the separator swallow the surrounding whitespace
+    names = _TAG_SEPARATOR.split(raw_tags.strip().lower())
+    return list(dict.fromkeys(name for name in names if name))
 
 
 def normalize_clipboard_name(name: str, fallback: str, is_text: bool) -> str:
@@ -738,45 +1132,80 @@ def get_or_create_tags(tag_names: list[str], user_id: int) -> list[ClipboardTag]
     """Fetch existing tags and create missing ones for a user."""
     if not tag_names:
         return []
-    existing = (
-        ClipboardTag.query.filter(
+    insert = UPSERT_INSERTS.get(db.session.get_bind().dialect.name)
+    if insert is None:
+        return _get_or_create_tags_orm(tag_names, user_id)
+
+    # One INSERT for every name, skipping those that exist, then one SELECT
+    rows = [{"user_id": user_id, "name": name} for name in tag_names]
+    db.session.execute(
+        insert(ClipboardTag).values(rows).on_conflict_do_nothing(index_elements=["user_id", "name"])
+    )
+    return list(
+        db.session.scalars(
+            select(ClipboardTag).where(
+                ClipboardTag.user_id == user_id,
+                ClipboardTag.name.in_(tag_names),
+            )
+        )
+    )
+
+
+def _get_or_create_tags_orm(tag_names: list[str], user_id: int) -> list[ClipboardTag]:
+    """Portable fallback for databases without INSERT ... ON CONFLICT."""
+    existing = db.session.scalars(
+        select(ClipboardTag.name).where(
             ClipboardTag.user_id == user_id,
             ClipboardTag.name.in_(tag_names),
         )
-        .all()
+    ).all()
+    missing = set(tag_names).difference(existing)
+    if missing:
+        # One executemany INSERT for every new name
+        db.session.execute(
+            ClipboardTag.__table__.insert(),
+            [{"user_id": user_id, "name": name} for name in missing],
+        )
+    return list(
+        db.session.scalars(
+            select(ClipboardTag).where(
+                ClipboardTag.user_id == user_id,
+                ClipboardTag.name.in_(tag_names),
+            )
+        )
     )
-    existing_map = {tag.name: tag for tag in existing}
-    new_tags = []
-    for name in tag_names:
-        if name in existing_map:
-            continue
-        tag = ClipboardTag(user_id=user_id, name=name)
-        db.session.add(tag)
-        new_tags.append(tag)
-    if new_tags:
-        db.session.flush()
-        existing.extend(new_tags)
-    return existing
 
 
 def build_folder_options(user_id: int) -> list[dict]:
-    """Build a list of folder options with indentation for select inputs."""
-    folders = ClipboardFolder.query.filter_by(user_id=user_id).all()
-    children_map: dict[str | None, list[ClipboardFolder]] = defaultdict(list)
-    for folder in folders:
-        children_map[folder.parent_id].append(folder)
-    for child_list in children_map.values():
-        child_list.sort(key=lambda f: f.name.lower())
+    """Build a list of folder options with indentation for select inputs.
+
+    The result is cached on ``g`` for the rest of the request.
+    """
+    cache_key = f"folder_options_{user_id}"
+    cached: list[dict] | None = g.get(cache_key)
+    if cached is not None:
+        return cached
+
+    rows = db.session.execute(
+        select(ClipboardFolder.id, ClipboardFolder.name, ClipboardFolder.parent_id)
+        .where(ClipboardFolder.user_id == user_id)
+        .order_by(ClipboardFolder.parent_id.asc().nulls_first(), func.lower(ClipboardFolder.name))
+    )
+    # Rows arrive sorted, so each sibling list is already alphabetical
+    children_map: dict[str | None, list[tuple[str, str]]] = defaultdict(list)
+    for folder_id, name, parent_id in rows:
+        children_map[parent_id].append((name, folder_id))
 
     options = []
-
-    def walk(parent_id: str | None, depth: int) -> None:
-        for folder in children_map.get(parent_id, []):
-            label = f"{'-' * depth} {folder.name}" if depth else folder.name
-            options.append({"id": folder.id, "label": label})
-            walk(folder.id, depth + 1)
-
-    walk(None, 0)
+    # Reversed so popping from the stack visits siblings alphabetically
+    stack = [(child, 0) for child in reversed(children_map.get(None, []))]
+    while stack:
+        (name, folder_id), depth = stack.pop()
+        label = f"{'-' * depth} {name}" if depth else name
+        options.append({"id": folder_id, "label": label})
+        stack.extend((child, depth + 1) for child in reversed(children_map.get(folder_id, [])))
+
+    setattr(g, cache_key, options)
     return options
 
 
@@ -790,11 +1219,26 @@ def build_folder_breadcrumbs(folder: ClipboardFolder) -> list[ClipboardFolder]:
     return list(reversed(crumbs))
 
 
-def serialize_clipboard_item(item: ClipboardItem) -> dict:
-    """Serialize clipboard item for template rendering."""
+def build_text_preview(text: str) -> bytes:
+    """Encrypt the start of clipboard text for storage in ``text_preview``."""
+    preview = text[:CLIPBOARD_PREVIEW_CHARS].encode("utf-8")
+    return encrypt_data_safe(preview, get_encryption_key())
+
+
+def serialize_clipboard_item(item: ClipboardItem, preview: bool = False) -> dict:
+    """Serialize clipboard item for template rendering.
+
+    With ``preview`` set, text items carry only their stored preview instead
+    of the full decrypted content; ``truncated`` tells whether it is partial.
+    """
     content_text = ""
+    truncated = False
     if item.is_text:
-        raw = decrypt_data_safe(item.content, get_encryption_key())
+        if preview and item.text_preview is not None:
+            raw = decrypt_data_safe(item.text_preview, get_encryption_key())
+            truncated = len(raw) < item.size
+        else:
+            raw = decrypt_data_safe(item.content, get_encryption_key())
         content_text = raw.decode("utf-8", errors="replace")
     return {
         "id": item.id,
@@ -808,30 +1252,64 @@ def serialize_clipboard_item(item: ClipboardItem) -> dict:
         "folder_id": item.folder_id,
         "is_text": item.is_text,
         "content": content_text,
+        "truncated": truncated,
         "expires_at": item.expires_at,
         "kept": item.expires_at is None,
     }
 
 
-def get_file_properties(storage_file):
-    """Get properties of a file from StorageFile object."""
+def serialize_clipboard_items(items: Iterable[ClipboardItem]) -> list[dict]:
+    """Serialize several clipboard items for a listing.
+
+    Accepts either a query, which loads all tags in one extra query and skips
+    the full content column, or items that were already loaded. Text items
+    are serialized from their stored preview.
+    """
+    if hasattr(items, "options"):
+        items = items.options(selectinload(ClipboardItem.tags), defer(ClipboardItem.content)).all()
+        load_content_without_preview(items)
+    return [serialize_clipboard_item(item, preview=True) for item in items]
+
+
+def load_content_without_preview(items: Iterable[ClipboardItem]) -> None:
+    """Load content in one query for text items saved before text_preview existed.
+
+    Listing queries defer content, so each such item would otherwise load it
+    with a query of its own when serialized.
+    """
+    pending = {item.id: item for item in items if item.is_text and item.text_preview is None}
+    if not pending:
+        return
+    rows = db.session.execute(
+        select(ClipboardItem.id, ClipboardItem.content).where(ClipboardItem.id.in_(pending))
+    )
+    for item_id, content in rows:
+        set_committed_value(pending[item_id], "content", content)
+
+
+class FileProperties(NamedTuple):
+    """One row of the upload listing."""
+
+    name: str
+    size: int
+    size_human: str
+    creation_time: datetime
+    extension: str
+
+
+def get_file_properties(storage_file: StorageFile) -> FileProperties:
+    """Get properties of a file from StorageFile object.
+
+    Only metadata is returned; file contents are never read for the listing.
+    A tuple row is smaller than a dict, and Jinja resolves file.name on it
+    with its first getattr instead of falling back to item lookup.
+    """
     filename = storage_file.key
     file_size = storage_file.size
-    file_creation_time = storage_file.last_modified
-    content = ""
-    if filename.endswith(".txt"):
-        try:
-            storage = get_storage()
-            encrypted_data = storage.read(filename)
-            data = decrypt_data_safe(encrypted_data, get_encryption_key())
-            content = data.decode("utf-8")
-        except (IOError, UnicodeDecodeError, Exception):
-            content = "[Unable to read file content]"
-    return {
-        "name": filename,
-        "size": file_size,
-        "size_human": human_readable_size(file_size),
-        "creation_time": file_creation_time,
-        "content": content,
-        "extension": get_file_extension(filename),
-    }
+    return FileProperties(
+        name=filename,
+        size=file_size,
+        size_human=human_readable_size(file_size),
+        creation_time=storage_file.last_modified,
+        extension=get_file_extension(filename),
+    )
@@ -4,13 +4,33 @@ Uses AES-256-GCM for authenticated encryption.
 """
 
 import base64
+import codecs
+import io
+import itertools
 import os
+from collections.abc import Iterable, Iterator
+from functools import lru_cache, partial
+from typing import TYPE_CHECKING, BinaryIO
 
 from cryptography.exceptions import InvalidTag
+from cryptography.hazmat.backends.openssl.backend import backend
+from cryptography.hazmat.primitives.ciphers import Cipher, algorithms, modes
 from cryptography.hazmat.primitives.ciphers.aead import AESGCM
 
+if TYPE_CHECKING:
+    from _typeshed import WriteableBuffer
+
 NONCE_SIZE = 12  # 96 bits for GCM (recommended)
 KEY_SIZE = 32  # 256 bits for AES-256
+TAG_SIZE = 16  # 128-bit GCM authentication tag
+STREAM_CHUNK_SIZE = 1024 * 1024  # 1 MiB per read when streaming
+SNIFF_SIZE = 1024  # Bytes inspected by is_likely_encrypted()
+
+# Chunked stream format: magic, 4-byte big-endian chunk size, base nonce
+STREAM_MAGIC = b"CDv2"
+STREAM_HEADER_SIZE = len(STREAM_MAGIC) + 4 + NONCE_SIZE
+_MORE_RECORDS = b"\x00"  # Associated data suffix for all but the last record
+_LAST_RECORD = b"\x01"
 
 # Magic bytes for common file types (used for legacy file detection)
 FILE_SIGNATURES = {
@@ -22,6 +42,10 @@ FILE_SIGNATURES = {
     b"PK\x03\x04": "zip",
     b"!<arch>": "pst",
 }
+_SIGNATURE_PREFIXES = tuple(FILE_SIGNATURES)
+# Control characters other than tab, LF and CR, which never start a text file
+_CONTROL_BYTES = bytes(c for c in range(0x20) if c not in (0x09, 0x0A, 0x0D))
+_utf8_decoder = codecs.getincrementaldecoder("utf-8")
 
 
 def generate_key() -> bytes:
@@ -41,6 +65,17 @@ def load_key_from_env(env_value: str) -> bytes:
     return base64.b64decode(env_value)
 
 
+def openssl_version() -> str:
+    """Describe the OpenSSL build behind AESGCM, which selects AES-NI/ARMv8 CE itself."""
+    return backend.openssl_version_text()
+
+
+@lru_cache(maxsize=8)
+def _cipher(key: bytes) -> AESGCM:
+    """Return an AESGCM instance for key, reused across calls with the same key."""
+    return AESGCM(key)
+
+
 def encrypt_data(plaintext: bytes, key: bytes) -> bytes:
     """
     Encrypt data with AES-256-GCM.
@@ -51,8 +86,7 @@ def encrypt_data(plaintext: bytes, key: bytes) -> bytes:
         raise ValueError(f"Key must be {KEY_SIZE} bytes")
 
     nonce = os.urandom(NONCE_SIZE)
-    aesgcm = AESGCM(key)
-    ciphertext = aesgcm.encrypt(nonce, plaintext, None)
+    ciphertext = _cipher(key).encrypt(nonce, plaintext, None)
     return nonce + ciphertext
 
 
@@ -60,19 +94,244 @@ def decrypt_data(encrypted: bytes, key: bytes) -> bytes:
     """
     Decrypt AES-256-GCM data.
 
-    Expects: nonce (12 bytes) + ciphertext + auth tag (16 bytes)
+    Expects: nonce (12 bytes) + ciphertext + auth tag (16 bytes), or the
+    record format written by encrypt_stream().
     Raises InvalidTag if data is corrupted or key is wrong.
     """
     if not key or len(key) != KEY_SIZE:
         raise ValueError(f"Key must be {KEY_SIZE} bytes")
 
+    if encrypted[: len(STREAM_MAGIC)] == STREAM_MAGIC and len(encrypted) >= STREAM_HEADER_SIZE:
+        # Written by encrypt_stream()
+        return b"".join(_decrypt_records([encrypted], key))
+
     if len(encrypted) < NONCE_SIZE + 16:  # Minimum: nonce + auth tag
         raise ValueError("Encrypted data too short")
 
-    nonce = encrypted[:NONCE_SIZE]
-    ciphertext = encrypted[NONCE_SIZE:]
-    aesgcm = AESGCM(key)
-    return aesgcm.decrypt(nonce, ciphertext, None)
+    # Slice through a memoryview so the ciphertext is not copied before decrypting
+    view = memoryview(encrypted)
+    return _cipher(key).decrypt(view[:NONCE_SIZE], view[NONCE_SIZE:], None)
+
+
+def iter_chunks(stream: BinaryIO, chunk_size: int = STREAM_CHUNK_SIZE) -> Iterator[bytes]:
+    """Yield successive chunks read from a binary file-like object until EOF."""
+    return iter(partial(stream.read, chunk_size), b"")
+
+
+def encrypt_stream(
+    chunks: Iterable[bytes], key: bytes, chunk_size: int = STREAM_CHUNK_SIZE
+) -> Iterator[bytes]:
+    """
+    Encrypt an iterable of plaintext chunks with AES-256-GCM, record by record.
+
+    Yields: a header (magic, chunk size, base nonce), then one sealed record
+    (ciphertext + 16-byte auth tag) per chunk_size bytes of plaintext. Each
+    record uses the base nonce XOR its index and is authenticated on its own,
+    so readers never see unverified plaintext; the last record is flagged in
+    the associated data so a truncated stream fails to decrypt.
+    """
+    if not key or len(key) != KEY_SIZE:
+        raise ValueError(f"Key must be {KEY_SIZE} bytes")
+
+    base_nonce = os.urandom(NONCE_SIZE)
+    header = STREAM_MAGIC + chunk_size.to_bytes(4, "big") + base_nonce
+    return _encrypt_records(_rechunk(chunks, chunk_size), _cipher(key), header)
+
+
+def _encrypt_records(chunks: Iterator[bytes], aesgcm: AESGCM, header: bytes) -> Iterator[bytes]:
+    yield header
+    base_nonce = header[-NONCE_SIZE:]
+    index = 0
+    record = next(chunks, b"")
+    for following in chunks:
+        yield aesgcm.encrypt(_record_nonce(base_nonce, index), record, header + _MORE_RECORDS)
+        index += 1
+        record = following
+    yield aesgcm.encrypt(_record_nonce(base_nonce, index), record, header + _LAST_RECORD)
+
+
+def _rechunk(chunks: Iterable[bytes], size: int) -> Iterator[bytes]:
+    """Regroup chunks into pieces of exactly size bytes; only the last may be shorter."""
+    buffer = bytearray()
+    for chunk in chunks:
+        if not buffer and len(chunk) == size:
+            yield chunk
+            continue
+        buffer += chunk
+        while len(buffer) >= size:
+            yield bytes(buffer[:size])
+            del buffer[:size]
+    if buffer:
+        yield bytes(buffer)
+
+
+def _record_nonce(base_nonce: bytes, index: int) -> bytes:
+    return (int.from_bytes(base_nonce, "big") ^ index).to_bytes(NONCE_SIZE, "big")
+
+
+def decrypt_stream(chunks: Iterable[bytes], key: bytes) -> Iterator[bytes]:
+    """
+    Decrypt an iterable of ciphertext chunks split at arbitrary boundaries.
+
+    Accepts both the record format written by encrypt_stream() and the
+    single-message layout written by encrypt_data(). Records are verified
+    before their plaintext is yielded; for the single-message layout the tag
+    is only checked once the input is exhausted. Raises InvalidTag if the
+    data is corrupted or the key is wrong.
+    """
+    if not key or len(key) != KEY_SIZE:
+        raise ValueError(f"Key must be {KEY_SIZE} bytes")
+    return _decrypt_chunks(iter(chunks), key)
+
+
+def _decrypt_chunks(chunks: Iterator[bytes], key: bytes) -> Iterator[bytes]:
+    head = b""
+    for chunk in chunks:
+        head += chunk
+        if len(head) >= STREAM_HEADER_SIZE:
+            break
+    chunks = itertools.chain([head], chunks)
+    if head.startswith(STREAM_MAGIC) and len(head) >= STREAM_HEADER_SIZE:
+        return _decrypt_records(chunks, key)
+    return _decrypt_message(chunks, key)
+
+
+def _decrypt_records(chunks: Iterable[bytes], key: bytes) -> Iterator[bytes]:
+    aesgcm = _cipher(key)
+    buffer = bytearray()
+    header = None
+    index = 0
+    for chunk in chunks:
+        buffer += chunk
+        if header is None:
+            if len(buffer) < STREAM_HEADER_SIZE:
+                continue
+            header = bytes(buffer[:STREAM_HEADER_SIZE])
+            del buffer[:STREAM_HEADER_SIZE]
+            base_nonce = header[-NONCE_SIZE:]
+            record_size = int.from_bytes(header[len(STREAM_MAGIC) : -NONCE_SIZE], "big") + TAG_SIZE
+
+        # A record is only known not to be the last once more data follows it
+        while len(buffer) > record_size:
+            yield aesgcm.decrypt(
+                _record_nonce(base_nonce, index), buffer[:record_size], header + _MORE_RECORDS
+            )
+            del buffer[:record_size]
+            index += 1
+
+    if header is None or len(buffer) < TAG_SIZE:
+        raise ValueError("Encrypted data too short")
+    yield aesgcm.decrypt(_record_nonce(base_nonce, index), bytes(buffer), header + _LAST_RECORD)
+
+
+class RecordReader(io.RawIOBase):
+    """Seekable, read-only plaintext view of a stream written by encrypt_stream().
+
+    Only the records covering the bytes actually read are fetched and
+    authenticated, so HTTP Range requests can be served from the middle of a
+    large file. The underlying stream must be seekable and is closed with
+    the reader.
+    """
+
+    def __init__(self, stream: BinaryIO, key: bytes, ciphertext_size: int):
+        if not key or len(key) != KEY_SIZE:
+            raise ValueError(f"Key must be {KEY_SIZE} bytes")
+        stream.seek(0)
+        header = stream.read(STREAM_HEADER_SIZE)
+        if len(header) < STREAM_HEADER_SIZE or not header.startswith(STREAM_MAGIC):
+            raise ValueError("Not a chunked encrypted stream")
+
+        self._stream = stream
+        self._aesgcm = _cipher(key)
+        self._header = header
+        self._base_nonce = header[-NONCE_SIZE:]
+        self._chunk_size = int.from_bytes(header[len(STREAM_MAGIC) : -NONCE_SIZE], "big")
+        body_size = ciphertext_size - STREAM_HEADER_SIZE
+        # Every record but the last is full, and even empty input has one record
+        self._records = max(1, -(-body_size // (self._chunk_size + TAG_SIZE)))
+        self.size = body_size - self._records * TAG_SIZE
+        if self.size < 0:
+            raise ValueError("Encrypted data too short")
+        self._position = 0
+        self._index = -1
+        self._plaintext = b""
+
+    def readable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return True
+
+    def tell(self) -> int:
+        return self._position
+
+    def seek(self, offset: int, whence: int = io.SEEK_SET) -> int:
+        if whence == io.SEEK_CUR:
+            offset += self._position
+        elif whence == io.SEEK_END:
+            offset += self.size
+        if offset < 0:
+            raise ValueError("Negative seek position")
+        self._position = offset
+        return offset
+
+    def readinto(self, buffer: "WriteableBuffer") -> int:
+        view = memoryview(buffer).cast("B")
+        filled = 0
+        while filled < len(view) and self._position < self.size:
+            index, start = divmod(self._position, self._chunk_size)
+            if index != self._index:
+                self._plaintext = self._decrypt_record(index)
+                self._index = index
+            size = min(len(view) - filled, len(self._plaintext) - start)
+            view[filled : filled + size] = self._plaintext[start : start + size]
+            filled += size
+            self._position += size
+        return filled
+
+    def close(self) -> None:
+        if not self.closed:
+            self._stream.close()
+        super().close()
+
+    def _decrypt_record(self, index: int) -> bytes:
+        record_size = self._chunk_size + TAG_SIZE
+        self._stream.seek(STREAM_HEADER_SIZE + index * record_size)
+        record = self._stream.read(record_size)
+        flag = _LAST_RECORD if index == self._records - 1 else _MORE_RECORDS
+        return self._aesgcm.decrypt(
+            _record_nonce(self._base_nonce, index), record, self._header + flag
+        )
+
+
+def _decrypt_message(chunks: Iterable[bytes], key: bytes) -> Iterator[bytes]:
+    header = b""
+    decryptor = None
+    # The last TAG_SIZE bytes seen so far may be the tag, so they are held back
+    tail = b""
+    for chunk in chunks:
+        if decryptor is None:
+            header += chunk
+            if len(header) < NONCE_SIZE:
+                continue
+            nonce = header[:NONCE_SIZE]
+            decryptor = Cipher(algorithms.AES(key), modes.GCM(nonce)).decryptor()
+            chunk = header[NONCE_SIZE:]
+
+        if len(chunk) >= TAG_SIZE:
+            if tail:
+                yield decryptor.update(tail)
+            yield decryptor.update(memoryview(chunk)[:-TAG_SIZE])
+            tail = chunk[-TAG_SIZE:]
+        else:
+            tail += chunk
+            if len(tail) > TAG_SIZE:
+                yield decryptor.update(tail[:-TAG_SIZE])
+                tail = tail[-TAG_SIZE:]
+
+    if decryptor is None or len(tail) < TAG_SIZE:
+        raise ValueError("Encrypted data too short")
+    yield decryptor.finalize_with_tag(tail)
 
 
 def is_likely_encrypted(data: bytes) -> bool:
@@ -86,23 +345,28 @@ def is_likely_encrypted(data: bytes) -> bool:
         # Too short to be encrypted with our scheme
         return False
 
-    # Check for common file magic bytes (plaintext files)
-    for signature in FILE_SIGNATURES:
-        if data.startswith(signature):
-            return False
+    if data.startswith(STREAM_MAGIC):
+        return True
+
+    # Check for common file magic bytes (plaintext files) in one C-level call
+    if data.startswith(_SIGNATURE_PREFIXES):
+        return False
 
-    # Check if it looks like valid UTF-8 text (for .txt files)
+    # Text starts with printable characters: deleting control bytes is a no-op
+    head = data[:100]
+    if len(head.translate(None, _CONTROL_BYTES)) != len(head):
+        return True
+
+    # Check if it looks like valid UTF-8 text (for .txt files); only the first
+    # 1KB is checked, and a character cut off at its end is not an error
+    sample = data[:SNIFF_SIZE]
+    if sample.isascii():
+        return False
     try:
-        # Only check first 1KB to avoid memory issues with large files
-        sample = data[:1024]
-        sample.decode("utf-8")
-        # If it's valid UTF-8 and starts with printable chars, likely plaintext
-        if sample and all(c >= 0x20 or c in (0x09, 0x0A, 0x0D) for c in sample[:100]):
-            return False
+        _utf8_decoder().decode(sample, final=False)
     except UnicodeDecodeError:
-        pass
-
-    return True
+        return True
+    return False
 
 
 def safe_decrypt(data: bytes, key: bytes) -> tuple[bytes, bool]:
@@ -1,7 +1,47 @@
 """Shared Flask extensions."""
 
+from typing import Any
+
+from flask.json.provider import DefaultJSONProvider
 from flask_login import LoginManager
 from flask_sqlalchemy import SQLAlchemy
+from werkzeug.sansio.response import Response
+
+try:
+    import orjson
+except ImportError:  # Optional speedup; the stdlib encoder is used without it
+    orjson = None  # type: ignore[assignment]
 
 db = SQLAlchemy()
 login_manager = LoginManager()
+
+
+class ORJSONProvider(DefaultJSONProvider):
+    """JSON provider backed by orjson, encoding responses straight to bytes.
+
+    Output matches the default provider: keys are sorted and values orjson
+    cannot encode natively (including datetimes) go through the default hook.
+    """
+
+    def _options(self) -> int:
+        options = orjson.OPT_PASSTHROUGH_DATETIME
+        if self.sort_keys:
+            options |= orjson.OPT_SORT_KEYS
+        return options
+
+    def dumps(self, obj: Any, **kwargs: Any) -> str:
+        return orjson.dumps(obj, default=self.default, option=self._options()).decode()
+
+    def loads(self, s: str | bytes, **kwargs: Any) -> Any:
+        return orjson.loads(s)
+
+    def response(self, *args: Any, **kwargs: Any) -> Response:
+        obj = self._prepare_response_obj(args, kwargs)
+        options = self._options() | orjson.OPT_APPEND_NEWLINE
+        if (self.compact is None and self._app.debug) or self.compact is False:
+            options |= orjson.OPT_INDENT_2
+        # response_class is the app's WSGI Response, which takes a bytes body
+        return self._app.response_class(
+            orjson.dumps(obj, default=self.default, option=options),  # type: ignore[arg-type]
+            mimetype=self.mimetype,
+        )
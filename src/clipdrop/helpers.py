@@ -4,48 +4,92 @@ Shared helper functions and constants for ClipDrop.
 This module consolidates common functionality to avoid code duplication (DRY).
 """
 
+import hashlib
+import io
+import itertools
+import queue
+import re
+import threading
+from collections.abc import Iterable, Iterator
 from datetime import datetime, timedelta, timezone
+from types import MappingProxyType
+from typing import TYPE_CHECKING, BinaryIO
 
 from flask import jsonify
 
-from clipdrop.crypto import encrypt_data, safe_decrypt
+from clipdrop.crypto import (
+    SNIFF_SIZE,
+    STREAM_HEADER_SIZE,
+    STREAM_MAGIC,
+    RecordReader,
+    decrypt_stream,
+    encrypt_data,
+    encrypt_stream,
+    is_likely_encrypted,
+    iter_chunks,
+    safe_decrypt,
+)
+
+if TYPE_CHECKING:
+    from _typeshed import WriteableBuffer
 
 # =============================================================================
 # Constants
 # =============================================================================
 
-ALLOWED_EXTENSIONS = {
-    "txt",
-    "pdf",
-    "png",
-    "jpg",
-    "jpeg",
-    "gif",
-    "pst",
-    "md",
-    "json",
-    "zip",
-    "tar",
-    "py",
-    "html",
-    "css",
-}
-
-MIMETYPE_MAP = {
-    "txt": "text/plain",
-    "pdf": "application/pdf",
-    "png": "image/png",
-    "jpg": "image/jpeg",
-    "jpeg": "image/jpeg",
-    "gif": "image/gif",
-    "json": "application/json",
-    "html": "text/html",
-    "css": "text/css",
-    "md": "text/markdown",
-    "py": "text/x-python",
-    "zip": "application/zip",
-    "tar": "application/x-tar",
-}
+ALLOWED_EXTENSIONS = frozenset(
+    {
+        "txt",
+        "pdf",
+        "png",
+        "jpg",
+        "jpeg",
+        "gif",
+        "pst",
+        "md",
+        "json",
+        "zip",
+        "tar",
+        "py",
+        "html",
+        "css",
+    }
+)
+
+_SIZE_UNITS = ("B", "KB", "MB", "GB", "TB", "PB")
+
+# Uploads that can be previewed inline as text, and how much of them to show
+PREVIEW_EXTENSIONS = frozenset({"txt", "md", "json", "py", "css", "html"})
+PREVIEW_SIZE = 4 * 1024
+
+# Characters of clipboard text kept alongside the item for list pages
+CLIPBOARD_PREVIEW_CHARS = 512
+
+# Longest stored upload name; most filesystems cap a file name at 255 bytes
+MAX_STORED_FILENAME_LENGTH = 255
+
+# Every stored name went through secure_filename on upload, which only emits
+# ASCII letters, digits, "._-" and never a leading dot
+_STORED_FILENAME = re.compile(rf"[A-Za-z0-9_-][A-Za-z0-9._-]{{0,{MAX_STORED_FILENAME_LENGTH - 1}}}")
+
+# Read-only: shared by every request, so it must not be mutated at runtime
+MIMETYPE_MAP = MappingProxyType(
+    {
+        "txt": "text/plain",
+        "pdf": "application/pdf",
+        "png": "image/png",
+        "jpg": "image/jpeg",
+        "jpeg": "image/jpeg",
+        "gif": "image/gif",
+        "json": "application/json",
+        "html": "text/html",
+        "css": "text/css",
+        "md": "text/markdown",
+        "py": "text/x-python",
+        "zip": "application/zip",
+        "tar": "application/x-tar",
+    }
+)
 
 OAUTH_ERROR_MESSAGES = {
     "bad_verification_code": "The login code has expired. Please try signing in again.",
@@ -124,6 +168,168 @@ def decrypt_data_safe(data: bytes, key: bytes | None) -> bytes:
     return data
 
 
+# =============================================================================
+# Streaming Helpers
+# =============================================================================
+
+
+PREFETCH_DEPTH = 4  # Chunks a background producer may run ahead of its consumer
+
+
+def prefetch(chunks: Iterable[bytes], depth: int = PREFETCH_DEPTH) -> Iterator[bytes]:
+    """Produce chunks on a background thread, at most depth chunks ahead.
+
+    Lets reading and encrypting an upload overlap with the storage backend
+    writing earlier chunks. Exceptions raised by the producer are re-raised
+    in the consumer; abandoning the iterator stops the producer.
+    """
+    pending: queue.Queue = queue.Queue(maxsize=depth)
+    stop = threading.Event()
+    done = object()
+
+    def put(item: object) -> bool:
+        while not stop.is_set():
+            try:
+                pending.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def produce() -> None:
+        try:
+            for chunk in chunks:
+                if not put(chunk):
+                    return
+        except BaseException as exc:
+            put(exc)
+        else:
+            put(done)
+
+    threading.Thread(target=produce, name="clipdrop-prefetch", daemon=True).start()
+    try:
+        while (item := pending.get()) is not done:
+            if isinstance(item, BaseException):
+                raise item
+            yield item
+    finally:
+        stop.set()
+
+
+class ChunkReader(io.RawIOBase):
+    """Read-only binary file object backed by an iterator of byte chunks.
+
+    Lets generator-based pipelines (e.g. streaming encryption) be handed to
+    APIs that expect a file, such as shutil.copyfileobj or boto3 uploads.
+    """
+
+    def __init__(self, chunks: Iterable[bytes]):
+        self._chunks: Iterator[bytes] = iter(chunks)
+        self._pending = memoryview(b"")
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, buffer: "WriteableBuffer") -> int:
+        while not self._pending:
+            chunk = next(self._chunks, None)
+            if chunk is None:
+                return 0
+            self._pending = memoryview(chunk)
+        view = memoryview(buffer).cast("B")
+        size = min(len(view), len(self._pending))
+        view[:size] = self._pending[:size]
+        self._pending = self._pending[size:]
+        return size
+
+
+def encrypt_stream_safe(stream: BinaryIO, key: bytes | None) -> BinaryIO:
+    """Wrap a stream so it is encrypted on the fly if a key is available.
+
+    Args:
+        stream: Readable binary stream of plaintext
+        key: Encryption key (32 bytes) or None
+
+    Returns:
+        Readable stream of ciphertext if key provided, otherwise the original stream
+    """
+    if key:
+        return io.BufferedReader(ChunkReader(prefetch(encrypt_stream(iter_chunks(stream), key))))
+    return stream
+
+
+def hashing_stream(stream: BinaryIO, key: bytes | None = None) -> tuple[BinaryIO, hashlib.blake2b]:
+    """Wrap a stream so everything read through it also feeds a content hash.
+
+    The hash is BLAKE2b, keyed with the encryption key when one is set so the
+    digest cannot be used to confirm a guessed plaintext.
+
+    Args:
+        stream: Readable binary stream of plaintext
+        key: Encryption key (32 bytes) or None
+
+    Returns:
+        Tuple of (wrapped stream, hasher); read hasher.hexdigest() once the
+        wrapped stream has been consumed
+    """
+    hasher = hashlib.blake2b(digest_size=32, key=key or b"")
+
+    def chunks() -> Iterator[bytes]:
+        for chunk in iter_chunks(stream):
+            hasher.update(chunk)
+            yield chunk
+
+    return io.BufferedReader(ChunkReader(chunks())), hasher
+
+
+def decrypt_stream_safe(stream: BinaryIO, key: bytes | None) -> Iterator[bytes]:
+    """Iterate over a stream, decrypting it chunk by chunk if encrypted.
+
+    Legacy unencrypted files are detected from the first bytes and passed
+    through unchanged. Unlike decrypt_data_safe, data that looks encrypted but
+    fails authentication raises InvalidTag at the end of the stream, since
+    earlier chunks have already been yielded.
+
+    Args:
+        stream: Readable binary stream of potentially encrypted data
+        key: Encryption key (32 bytes) or None
+
+    Returns:
+        Iterator of plaintext chunks
+    """
+    if not key:
+        return iter_chunks(stream)
+    head = stream.read(SNIFF_SIZE)
+    chunks = itertools.chain([head], iter_chunks(stream))
+    if not is_likely_encrypted(head):
+        return chunks
+    return decrypt_stream(chunks, key)
+
+
+def open_decrypted_reader(stream: BinaryIO, key: bytes | None, size: int) -> RecordReader | None:
+    """Wrap a stream in a seekable decrypting reader when its format allows it.
+
+    Only seekable streams in the chunked record format qualify; for anything
+    else (no key, legacy layouts, non-seekable backends) None is returned and
+    the stream is left at its start for decrypt_stream_safe.
+
+    Args:
+        stream: Readable binary stream of potentially encrypted data
+        key: Encryption key (32 bytes) or None
+        size: Size of the stored (encrypted) data in bytes
+
+    Returns:
+        RecordReader over the plaintext, or None
+    """
+    if not key or not stream.seekable():
+        return None
+    head = stream.read(STREAM_HEADER_SIZE)
+    stream.seek(0)
+    if len(head) < STREAM_HEADER_SIZE or not head.startswith(STREAM_MAGIC):
+        return None
+    return RecordReader(stream, key, size)
+
+
 # =============================================================================
 # Expiration Helpers
 # =============================================================================
@@ -177,9 +383,42 @@ def get_file_extension(filename: str) -> str:
     Returns:
         Lowercase file extension or empty string
     """
-    if "." in filename:
-        return filename.rsplit(".", 1)[1].lower()
-    return ""
+    _, dot, extension = filename.rpartition(".")
+    return extension.lower() if dot else ""
+
+
+def truncate_filename(filename: str, max_length: int) -> str:
+    """Shorten a filename to at most max_length characters, keeping its extension.
+
+    Args:
+        filename: Sanitized filename
+        max_length: Longest allowed result
+
+    Returns:
+        The filename, with its stem cut short if it was too long
+    """
+    if len(filename) <= max_length:
+        return filename
+    stem, dot, extension = filename.rpartition(".")
+    if not dot or len(extension) + 1 >= max_length:
+        return filename[:max_length]
+    return f"{stem[: max_length - len(extension) - 1]}.{extension}"
+
+
+def is_stored_filename(filename: str) -> bool:
+    """Check that a filename from a URL could name a stored upload.
+
+    Names are sanitized once on upload, so retrieval paths only need to
+    reject anything secure_filename could not have produced (separators,
+    leading dots, non-ASCII) instead of sanitizing again.
+
+    Args:
+        filename: Untrusted filename
+
+    Returns:
+        True if the name is safe to look up in storage
+    """
+    return _STORED_FILENAME.fullmatch(filename) is not None
 
 
 def human_readable_size(size_bytes: int | float) -> str:
@@ -191,11 +430,9 @@ def human_readable_size(size_bytes: int | float) -> str:
     Returns:
         Human readable string (e.g., "1.5 MB")
     """
-    for unit in ["B", "KB", "MB", "GB", "TB"]:
-        if size_bytes < 1024.0:
-            return f"{size_bytes:.1f} {unit}"
-        size_bytes /= 1024.0
-    return f"{size_bytes:.1f} PB"
+    # Each unit spans 10 bits, so the bit length picks the unit in one step
+    index = min(max(int(size_bytes).bit_length() - 1, 0) // 10, len(_SIZE_UNITS) - 1)
+    return f"{size_bytes / (1 << (index * 10)):.1f} {_SIZE_UNITS[index]}"
 
 
 def allowed_file(filename: str) -> bool:
@@ -207,4 +444,4 @@ def allowed_file(filename: str) -> bool:
     Returns:
         True if extension is in ALLOWED_EXTENSIONS
     """
-    return "." in filename and filename.rsplit(".", 1)[1].lower() in ALLOWED_EXTENSIONS
+    return get_file_extension(filename) in ALLOWED_EXTENSIONS
@@ -55,6 +55,15 @@ class ClipboardFolder(db.Model):
     parent = db.relationship("ClipboardFolder", remote_side=[id], backref="children")
 
 
+# Matches the folder tree query: one user's folders by parent, then by name
+db.Index(
+    "ix_clipboard_folder_user_parent_lower_name",
+    ClipboardFolder.user_id,
+    ClipboardFolder.parent_id,
+    db.func.lower(ClipboardFolder.name),
+)
+
+
 class ClipboardTag(db.Model):
     __table_args__ = (db.UniqueConstraint("user_id", "name"),)
 
@@ -68,6 +77,13 @@ class ClipboardItem(db.Model):
     __table_args__ = (
         db.Index("ix_clipboard_item_user_folder", "user_id", "folder_id"),
         db.Index("ix_clipboard_item_user_favorite", "user_id", "favorite"),
+        # Partial: only expiring items are indexed, which is what the janitor scans
+        db.Index(
+            "ix_clipboard_item_expires_at",
+            "expires_at",
+            postgresql_where=db.text("expires_at IS NOT NULL"),
+            sqlite_where=db.text("expires_at IS NOT NULL"),
+        ),
     )
 
     id = db.Column(db.String(26), primary_key=True, default=generate_ulid)
@@ -75,6 +91,8 @@ class ClipboardItem(db.Model):
     folder_id = db.Column(db.String(26), db.ForeignKey("clipboard_folder.id"))
     name = db.Column(db.String(255), nullable=False)
     content = db.Column(db.LargeBinary, nullable=False)
+    # Start of the text content for listings, encrypted the same way as content
+    text_preview = db.Column(db.LargeBinary)
     content_type = db.Column(db.String(255), nullable=False)
     is_text = db.Column(db.Boolean, default=True, nullable=False)
     size = db.Column(db.Integer, nullable=False)
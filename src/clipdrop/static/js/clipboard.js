@@ -119,13 +119,32 @@
         });
     }
 
+    /**
+     * Get the full text for a copy button
+     * Listings only embed a preview of long items, so those are fetched.
+     * @param {HTMLElement} button - Copy button
+     * @returns {Promise<string|null>} Text to copy, or null if it could not be loaded
+     */
+    async function getCopyContent(button) {
+        const rawUrl = button.getAttribute('data-raw-url');
+        if (!rawUrl) {
+            return button.getAttribute('data-content');
+        }
+        try {
+            const response = await fetch(rawUrl);
+            return response.ok ? await response.text() : null;
+        } catch (err) {
+            return null;
+        }
+    }
+
     function handleCopyButtons() {
         document.querySelectorAll('.copy-content-btn').forEach((button) => {
             button.addEventListener('click', async () => {
-                const content = button.getAttribute('data-content');
+                const content = await getCopyContent(button);
                 const originalHtml = button.innerHTML;
 
-                const success = await copyToClipboard(content);
+                const success = content !== null && await copyToClipboard(content);
                 if (window.showToast) {
                     window.showToast(success ? 'Copied to clipboard!' : 'Failed to copy', success ? 'success' : 'error');
                 }
@@ -1,6 +1,6 @@
 /**
  * Files Module
- * Handles file upload, share, and delete operations
+ * Handles file upload, preview, share, and delete operations
  */
 
 (function() {
@@ -57,10 +57,65 @@
         return response.json();
     }
 
+    /**
+     * Fetch the beginning of a text file for inline preview
+     * @param {string} filename - File name
+     * @returns {Promise<Object>} Response data with content and truncated flag
+     */
+    async function loadPreview(filename) {
+        const response = await fetch(`/uploads/${encodeURIComponent(filename)}/preview`);
+        return response.json();
+    }
+
+    /**
+     * Toggle an inline preview row below a file's table row
+     * @param {HTMLElement} btn - Preview button
+     */
+    async function togglePreview(btn) {
+        const row = btn.closest('tr');
+        const next = row.nextElementSibling;
+        if (next && next.classList.contains('preview-row')) {
+            next.remove();
+            btn.setAttribute('aria-expanded', 'false');
+            return;
+        }
+
+        try {
+            const data = await loadPreview(btn.dataset.filename);
+            if (data.status !== 'success') {
+                throw new Error(data.message);
+            }
+            const pre = document.createElement('pre');
+            pre.textContent = data.truncated ? `${data.content}\n…` : data.content;
+            const box = document.createElement('div');
+            box.className = 'clipboard-content';
+            box.appendChild(pre);
+            const cell = document.createElement('td');
+            cell.colSpan = row.children.length;
+            cell.appendChild(box);
+            const previewRow = document.createElement('tr');
+            previewRow.className = 'preview-row';
+            previewRow.appendChild(cell);
+            row.after(previewRow);
+            btn.setAttribute('aria-expanded', 'true');
+        } catch (err) {
+            if (window.showToast) {
+                window.showToast('Could not load preview', 'error');
+            }
+        }
+    }
+
     /**
      * Initialize file action event handlers
      */
     function initFileHandlers() {
+        // Preview buttons for text files
+        document.querySelectorAll('.preview-btn').forEach(function(btn) {
+            btn.addEventListener('click', function() {
+                togglePreview(this);
+            });
+        });
+
         // Share buttons for files
         document.querySelectorAll('.share-btn').forEach(function(btn) {
             btn.addEventListener('click', async function() {
@@ -86,6 +141,10 @@
                             try {
                                 const data = await deleteFile(filename);
                                 if (data.success) {
+                                    const preview = row && row.nextElementSibling;
+                                    if (preview && preview.classList.contains('preview-row')) {
+                                        preview.remove();
+                                    }
                                     if (row) row.remove();
                                     if (window.showToast) {
                                         window.showToast('File deleted successfully', 'success');
@@ -134,6 +193,7 @@
     window.ClipDrop.files = {
         share: shareFile,
         deleteFile: deleteFile,
+        preview: loadPreview,
         init: initFileHandlers
     };
 })();
@@ -0,0 +1,70 @@
+/**
+ * Folders Module
+ * Loads folder select options on demand instead of with the page.
+ */
+
+(function() {
+    'use strict';
+
+    /**
+     * Fetch the current user's folder options
+     * @param {string} url - Folder options endpoint
+     * @returns {Promise<Array<Object>>} Options with id and label
+     */
+    async function loadFolderOptions(url) {
+        const response = await fetch(url, { headers: { 'Accept': 'application/json' } });
+        const data = await response.json();
+        if (data.status !== 'success') {
+            throw new Error(data.message);
+        }
+        return data.folders;
+    }
+
+    /**
+     * Replace a select's folder options, keeping Root and the current choice
+     * @param {HTMLSelectElement} select - Folder select element
+     */
+    async function populateFolderSelect(select) {
+        const selected = select.value;
+        try {
+            const folders = await loadFolderOptions(select.dataset.optionsUrl);
+            const root = select.options[0];
+            select.replaceChildren(root);
+            folders.forEach(function(folder) {
+                const option = new Option(folder.label, folder.id, false, folder.id === selected);
+                select.appendChild(option);
+            });
+            select.value = selected;
+        } catch (err) {
+            if (window.showToast) {
+                window.showToast('Could not load folders', 'error');
+            }
+        }
+    }
+
+    /**
+     * Load options the first time each lazy folder select is used
+     */
+    function initFolderSelects() {
+        document.querySelectorAll('select[data-options-url]').forEach(function(select) {
+            let loading = null;
+            const load = function() {
+                loading = loading || populateFolderSelect(select);
+            };
+            select.addEventListener('focus', load);
+            select.addEventListener('pointerdown', load);
+        });
+    }
+
+    if (document.readyState === 'loading') {
+        document.addEventListener('DOMContentLoaded', initFolderSelects);
+    } else {
+        initFolderSelects();
+    }
+
+    window.ClipDrop = window.ClipDrop || {};
+    window.ClipDrop.folders = {
+        load: loadFolderOptions,
+        init: initFolderSelects
+    };
+})();
@@ -6,15 +6,65 @@ Supports multiple backends:
 - S3Storage: S3-compatible storage like Digital Ocean Spaces (production)
 """
 
+import hashlib
 import logging
 import os
+import shutil
+import tempfile
+import threading
+import time
 from abc import ABC, abstractmethod
+from collections.abc import Callable, Iterator
+from contextlib import closing
 from datetime import datetime, timedelta, timezone
 from io import BytesIO
 from typing import BinaryIO
 
+import ulid
+
+try:
+    import boto3
+    from boto3.s3.transfer import TransferConfig
+    from botocore.config import Config
+    from botocore.exceptions import BotoCoreError, ClientError
+except ImportError:  # Only needed for S3 storage
+    boto3 = None
+
 logger = logging.getLogger(__name__)
 
+STREAM_CHUNK_SIZE = 1024 * 1024  # 1 MiB copy buffer for streamed writes
+LISTING_CACHE_TTL = 2.0  # Seconds a cached local directory listing may be reused
+CONTENT_STORE_DIR = ".store"  # Content-addressed blobs that uploads hardlink to
+S3_PART_SIZE = 8 * 1024 * 1024  # Multipart threshold and part size for S3 uploads
+S3_MAX_CONCURRENCY = 8  # Parts uploaded in parallel per object
+S3_MAX_POOL_CONNECTIONS = 64  # Pooled HTTPS connections per S3 client (default 10)
+S3_DELETE_BATCH_SIZE = 1000  # Most keys a single DeleteObjects request accepts
+DEFAULT_CACHE_MAX_BYTES = 1024 * 1024 * 1024  # 1 GiB read cache when STORAGE_CACHE_DIR is set
+CACHE_TEMP_MAX_AGE = 3600  # Seconds before an unfinished cache download counts as abandoned
+ULID_LENGTH = 26  # Upload keys are "<ULID>_<filename>"
+
+
+def _current_umask() -> int:
+    """Read the process umask; os.umask can only be read by setting it."""
+    mask = os.umask(0)
+    os.umask(mask)
+    return mask
+
+
+def _ulid_timestamp(name: str) -> float | None:
+    """POSIX timestamp of a file name's ULID prefix, or None if it has none.
+
+    Deduplicated local keys are hardlinks sharing one inode, whose ctime
+    moves whenever another link is added or removed; the ULID records when
+    this particular key was uploaded.
+    """
+    if len(name) <= ULID_LENGTH or name[ULID_LENGTH] != "_":
+        return None
+    try:
+        return ulid.from_str(name[:ULID_LENGTH]).timestamp().timestamp
+    except ValueError:
+        return None
+
 
 class StorageFile:
     """Represents a file in storage with metadata."""
@@ -40,16 +90,52 @@ class StorageFile:
 class StorageBackend(ABC):
     """Abstract base class for storage backends."""
 
+    # Whether save_stream uses content_digest; callers skip hashing otherwise
+    deduplicates = False
+
     @abstractmethod
     def save(self, key: str, data: bytes, content_type: str | None = None) -> None:
         """Save data to storage."""
         pass
 
+    def save_stream(
+        self,
+        key: str,
+        stream: BinaryIO,
+        content_type: str | None = None,
+        content_digest: Callable[[], str] | None = None,
+    ) -> None:
+        """Save data read from a binary stream. Backends override this to avoid buffering.
+
+        content_digest, if given, is called once the stream is exhausted and
+        returns a hash of the content that backends may use to deduplicate.
+        """
+        self.save(key, stream.read(), content_type)
+
     @abstractmethod
     def read(self, key: str) -> bytes:
         """Read data from storage."""
         pass
 
+    def open(self, key: str) -> BinaryIO:
+        """Open a file for streaming reads. Callers must close the returned stream.
+
+        Raises FileNotFoundError if the key does not exist.
+        """
+        return BytesIO(self.read(key))
+
+    def read_into(self, key: str, out: BinaryIO) -> None:
+        """Copy a file's contents into a writable binary stream.
+
+        Raises FileNotFoundError if the key does not exist.
+        """
+        with closing(self.open(key)) as source:
+            shutil.copyfileobj(source, out, length=STREAM_CHUNK_SIZE)
+
+    def local_path(self, key: str) -> str | None:
+        """Get a filesystem path for a key, or None if the backend is not local."""
+        return None
+
     @abstractmethod
     def delete(self, key: str) -> bool:
         """Delete a file from storage. Returns True if deleted."""
@@ -71,12 +157,15 @@ class StorageBackend(ABC):
         pass
 
     def delete_older_than(self, prefix: str, max_age: timedelta) -> list[str]:
-        """Delete files older than max_age. Returns list of deleted keys."""
+        """Delete files older than max_age. Returns list of deleted keys.
+
+        Backends report last_modified as an aware UTC datetime, so each file
+        is checked with one comparison against a precomputed cutoff.
+        """
         deleted = []
-        now = datetime.now(timezone.utc)
+        cutoff = datetime.now(timezone.utc) - max_age
         for file in self.list_files(prefix):
-            file_age = now - file.last_modified.replace(tzinfo=timezone.utc)
-            if file_age > max_age:
+            if file.last_modified < cutoff:
                 if self.delete(file.key):
                     deleted.append(file.key)
                     logger.info(f"Deleted expired file: {file.key}")
@@ -86,13 +175,21 @@ class StorageBackend(ABC):
 class LocalStorage(StorageBackend):
     """Local filesystem storage backend."""
 
+    deduplicates = True
+
     def __init__(self, base_path: str):
         self.base_path = base_path
+        # Joined once; keys are appended to it without another os.path.join
+        self._base_with_sep = os.path.join(base_path, "")
         os.makedirs(base_path, exist_ok=True)
+        # Mode open() would give a new file, for files created via mkstemp
+        self._file_mode = 0o666 & ~_current_umask()
+        # (search_path, prefix) -> (directory mtime_ns, cached_at, files)
+        self._listing_cache: dict[tuple[str, str], tuple[int, float, list[StorageFile]]] = {}
 
     def _full_path(self, key: str) -> str:
         """Get full filesystem path for a key."""
-        return os.path.join(self.base_path, key)
+        return self._base_with_sep + key
 
     def save(self, key: str, data: bytes, content_type: str | None = None) -> None:
         """Save data to local filesystem."""
@@ -100,6 +197,62 @@ class LocalStorage(StorageBackend):
         os.makedirs(os.path.dirname(path) if os.path.dirname(key) else self.base_path, exist_ok=True)
         with open(path, "wb") as f:
             f.write(data)
+        self._listing_cache.clear()
+
+    def save_stream(
+        self,
+        key: str,
+        stream: BinaryIO,
+        content_type: str | None = None,
+        content_digest: Callable[[], str] | None = None,
+    ) -> None:
+        """Copy a binary stream to the local filesystem in fixed-size chunks.
+
+        With content_digest, the data is written into the content store and the
+        key becomes a hardlink to the stored blob, so identical uploads share
+        one copy on disk.
+        """
+        path = self._full_path(key)
+        os.makedirs(os.path.dirname(path) if os.path.dirname(key) else self.base_path, exist_ok=True)
+        if content_digest is None:
+            with open(path, "wb") as f:
+                shutil.copyfileobj(stream, f, length=STREAM_CHUNK_SIZE)
+        else:
+            self._save_deduplicated(path, stream, content_digest)
+        self._listing_cache.clear()
+
+    def _save_deduplicated(
+        self, path: str, stream: BinaryIO, content_digest: Callable[[], str]
+    ) -> None:
+        """Write a stream into the content store and hardlink path to the blob.
+
+        path is linked before a new blob is published, so a blob never has a
+        single link for a concurrent _prune_content_store to remove.
+        """
+        store = os.path.join(self.base_path, CONTENT_STORE_DIR)
+        os.makedirs(store, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=store, suffix=".tmp")
+        try:
+            # mkstemp creates 0600 files; match the mode open() gives other uploads
+            os.fchmod(fd, self._file_mode)
+            with os.fdopen(fd, "wb") as f:
+                shutil.copyfileobj(stream, f, length=STREAM_CHUNK_SIZE)
+            digest = content_digest()
+            blob = os.path.join(store, digest[:2], digest[2:4], digest)
+            try:
+                try:
+                    os.link(blob, path)
+                except FileNotFoundError:
+                    # New content (or a blob pruned since): publish the temp file
+                    os.link(tmp_path, path)
+                    os.makedirs(os.path.dirname(blob), exist_ok=True)
+                    os.replace(tmp_path, blob)
+            except OSError:
+                # No hardlink support: keep a private copy
+                os.replace(tmp_path, path)
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
 
     def read(self, key: str) -> bytes:
         """Read data from local filesystem."""
@@ -107,50 +260,124 @@ class LocalStorage(StorageBackend):
         with open(path, "rb") as f:
             return f.read()
 
+    def open(self, key: str) -> BinaryIO:
+        """Open a local file for streaming reads."""
+        return open(self._full_path(key), "rb")
+
+    def local_path(self, key: str) -> str | None:
+        """Get the filesystem path for a key."""
+        return self._full_path(key)
+
     def delete(self, key: str) -> bool:
         """Delete a file from local filesystem."""
-        path = self._full_path(key)
-        if os.path.exists(path):
-            os.remove(path)
-            return True
-        return False
+        try:
+            os.remove(self._full_path(key))
+        except FileNotFoundError:
+            return False
+        self._listing_cache.clear()
+        return True
 
     def exists(self, key: str) -> bool:
         """Check if a file exists on local filesystem."""
         return os.path.exists(self._full_path(key))
 
     def list_files(self, prefix: str = "") -> list[StorageFile]:
-        """List files in local directory."""
+        """List files in local directory.
+
+        Listings are cached briefly and reused while the directory mtime is
+        unchanged, so repeated page renders do not stat every file again.
+        """
+        search_path = self._search_path(prefix)
+        cache_key = (search_path, prefix)
+        mtime = os.stat(search_path).st_mtime_ns
+        now = time.monotonic()
+        cached = self._listing_cache.get(cache_key)
+        if cached and cached[0] == mtime and now - cached[1] < LISTING_CACHE_TTL:
+            return list(cached[2])
+
         files = []
+        for entry in self._iter_entries(search_path, prefix):
+            stat = entry.stat()
+            uploaded_at = _ulid_timestamp(entry.name) or stat.st_ctime
+            files.append(
+                StorageFile(
+                    key=entry.name,
+                    size=stat.st_size,
+                    last_modified=datetime.fromtimestamp(uploaded_at, tz=timezone.utc),
+                )
+            )
+        self._listing_cache[cache_key] = (mtime, now, files)
+        return list(files)
+
+    def delete_older_than(self, prefix: str, max_age: timedelta) -> list[str]:
+        """Delete files older than max_age in a single scandir pass."""
+        deleted = []
+        cutoff = time.time() - max_age.total_seconds()
+        for entry in self._iter_entries(self._search_path(prefix), prefix):
+            try:
+                if (_ulid_timestamp(entry.name) or entry.stat().st_ctime) >= cutoff:
+                    continue
+                os.remove(entry.path)
+            except FileNotFoundError:
+                # Already removed, e.g. by another worker's cleanup run
+                continue
+            deleted.append(entry.name)
+            logger.info(f"Deleted expired file: {entry.name}")
+        if deleted:
+            self._listing_cache.clear()
+        self._prune_content_store(cutoff)
+        return deleted
+
+    def _prune_content_store(self, cutoff: float) -> None:
+        """Remove stored blobs no key links to any more, and abandoned temp files."""
+        store = os.path.join(self.base_path, CONTENT_STORE_DIR)
+        for dirpath, _, filenames in os.walk(store):
+            for name in filenames:
+                path = os.path.join(dirpath, name)
+                try:
+                    stat = os.stat(path)
+                    if name.endswith(".tmp") and stat.st_mtime >= cutoff:
+                        continue
+                    if not name.endswith(".tmp") and stat.st_nlink > 1:
+                        continue
+                    os.remove(path)
+                except FileNotFoundError:
+                    continue
+
+    def _search_path(self, prefix: str) -> str:
+        """Get the directory to scan for a key prefix."""
         search_path = self._full_path(prefix) if prefix else self.base_path
         if not os.path.isdir(search_path):
             search_path = self.base_path
-
-        for filename in os.listdir(search_path):
-            if prefix and not filename.startswith(os.path.basename(prefix)):
-                continue
-            full_path = os.path.join(search_path, filename)
-            if os.path.isfile(full_path):
-                stat = os.stat(full_path)
-                files.append(
-                    StorageFile(
-                        key=filename,
-                        size=stat.st_size,
-                        last_modified=datetime.fromtimestamp(stat.st_ctime, tz=timezone.utc),
-                    )
-                )
-        return files
+        return search_path
+
+    def _iter_entries(self, search_path: str, prefix: str) -> Iterator[os.DirEntry]:
+        """Yield regular files in a directory whose names match the prefix.
+
+        Dotfiles such as the scheduler lock are skipped; stored names never
+        start with a dot.
+        """
+        name_prefix = os.path.basename(prefix) if prefix else ""
+        with os.scandir(search_path) as entries:
+            for entry in entries:
+                if entry.name.startswith(".") or (
+                    name_prefix and not entry.name.startswith(name_prefix)
+                ):
+                    continue
+                if entry.is_file():
+                    yield entry
 
     def get_file_info(self, key: str) -> StorageFile | None:
-        """Get file metadata from local filesystem."""
-        path = self._full_path(key)
-        if not os.path.exists(path):
+        """Get file metadata from local filesystem with a single stat call."""
+        try:
+            stat = os.stat(self._full_path(key))
+        except FileNotFoundError:
             return None
-        stat = os.stat(path)
+        uploaded_at = _ulid_timestamp(os.path.basename(key)) or stat.st_ctime
         return StorageFile(
             key=key,
             size=stat.st_size,
-            last_modified=datetime.fromtimestamp(stat.st_ctime, tz=timezone.utc),
+            last_modified=datetime.fromtimestamp(uploaded_at, tz=timezone.utc),
         )
 
 
@@ -166,20 +393,24 @@ class S3Storage(StorageBackend):
         secret_key: str | None = None,
         prefix: str = "",
     ):
-        try:
-            import boto3
-            from botocore.config import Config
-        except ImportError:
+        if boto3 is None:
             raise ImportError(
                 "boto3 is required for S3 storage. Install it with: pip install boto3"
             )
 
         self.bucket = bucket
         self.prefix = prefix.strip("/")
+        self._key_prefix = f"{self.prefix}/" if self.prefix else ""
 
+        # Request threads and multipart upload threads share one connection
+        # pool; keep-alive and short connect timeouts cut reconnect stalls
         config = Config(
             signature_version="s3v4",
             retries={"max_attempts": 3, "mode": "standard"},
+            max_pool_connections=S3_MAX_POOL_CONNECTIONS,
+            tcp_keepalive=True,
+            connect_timeout=5,
+            read_timeout=30,
         )
 
         self.client = boto3.client(
@@ -190,24 +421,49 @@ class S3Storage(StorageBackend):
             aws_secret_access_key=secret_key,
             config=config,
         )
+        # Built once: objects above one part go up as parallel multipart uploads
+        self._transfer_config = TransferConfig(
+            multipart_threshold=S3_PART_SIZE,
+            multipart_chunksize=S3_PART_SIZE,
+            max_concurrency=S3_MAX_CONCURRENCY,
+            use_threads=True,
+        )
 
     def _full_key(self, key: str) -> str:
         """Get full S3 key with prefix."""
-        if self.prefix:
-            return f"{self.prefix}/{key}"
-        return key
+        return self._key_prefix + key
+
+    def _relative_key(self, full_key: str) -> str:
+        """Strip the storage prefix from a full S3 key."""
+        if self._key_prefix and full_key.startswith(self._key_prefix):
+            return full_key[len(self._key_prefix) :]
+        return full_key
 
     def save(self, key: str, data: bytes, content_type: str | None = None) -> None:
         """Save data to S3."""
+        self.save_stream(key, BytesIO(data), content_type)
+
+    def save_stream(
+        self,
+        key: str,
+        stream: BinaryIO,
+        content_type: str | None = None,
+        content_digest: Callable[[], str] | None = None,
+    ) -> None:
+        """Stream data to S3, letting boto3 split it into multipart chunks.
+
+        Objects cannot be hardlinked, so content_digest is ignored.
+        """
         extra_args = {}
         if content_type:
             extra_args["ContentType"] = content_type
 
         self.client.upload_fileobj(
-            BytesIO(data),
+            stream,
             self.bucket,
             self._full_key(key),
             ExtraArgs=extra_args or None,
+            Config=self._transfer_config,
         )
 
     def read(self, key: str) -> bytes:
@@ -215,10 +471,39 @@ class S3Storage(StorageBackend):
         response = self.client.get_object(Bucket=self.bucket, Key=self._full_key(key))
         return response["Body"].read()
 
+    def open(self, key: str) -> BinaryIO:
+        """Open an S3 object body for streaming reads."""
+        try:
+            response = self.client.get_object(Bucket=self.bucket, Key=self._full_key(key))
+        except ClientError as e:
+            if e.response.get("Error", {}).get("Code") in ("NoSuchKey", "404"):
+                raise FileNotFoundError(key) from e
+            raise
+        body: BinaryIO = response["Body"]
+        return body
+
+    def read_into(self, key: str, out: BinaryIO) -> None:
+        """Download an S3 object into a stream as parallel ranged GETs.
+
+        out must be seekable, since parts can arrive out of order.
+        """
+        try:
+            self.client.download_fileobj(
+                self.bucket, self._full_key(key), out, Config=self._transfer_config
+            )
+        except ClientError as e:
+            if e.response.get("Error", {}).get("Code") in ("NoSuchKey", "404"):
+                raise FileNotFoundError(key) from e
+            raise
+
     def delete(self, key: str) -> bool:
-        """Delete a file from S3."""
-        from botocore.exceptions import BotoCoreError, ClientError
+        """Delete a file from S3. Returns False if it does not exist.
 
+        DeleteObject also succeeds for absent keys, so existence is checked
+        with a HEAD first.
+        """
+        if not self.exists(key):
+            return False
         try:
             self.client.delete_object(Bucket=self.bucket, Key=self._full_key(key))
             return True
@@ -228,42 +513,33 @@ class S3Storage(StorageBackend):
 
     def exists(self, key: str) -> bool:
         """Check if a file exists in S3."""
-        from botocore.exceptions import BotoCoreError, ClientError
-
         try:
             self.client.head_object(Bucket=self.bucket, Key=self._full_key(key))
             return True
         except (BotoCoreError, ClientError):
             return False
 
-    def list_files(self, prefix: str = "") -> list[StorageFile]:
-        """List files in S3 bucket with optional prefix."""
-        files = []
+    def _iter_objects(self, prefix: str = "") -> Iterator[dict]:
+        """Yield raw list_objects_v2 entries under a key prefix, page by page."""
         search_prefix = self._full_key(prefix) if prefix else self.prefix
-
         paginator = self.client.get_paginator("list_objects_v2")
-        pages = paginator.paginate(Bucket=self.bucket, Prefix=search_prefix)
-
-        for page in pages:
-            for obj in page.get("Contents", []):
-                key = obj["Key"]
-                # Remove prefix to get relative key
-                if self.prefix and key.startswith(self.prefix + "/"):
-                    key = key[len(self.prefix) + 1 :]
-                files.append(
-                    StorageFile(
-                        key=key,
-                        size=obj["Size"],
-                        last_modified=obj["LastModified"],
-                        content_type=obj.get("ContentType"),
-                    )
-                )
-        return files
+        for page in paginator.paginate(Bucket=self.bucket, Prefix=search_prefix):
+            yield from page.get("Contents", [])
+
+    def list_files(self, prefix: str = "") -> list[StorageFile]:
+        """List files in S3 bucket with optional prefix."""
+        return [
+            StorageFile(
+                key=self._relative_key(obj["Key"]),
+                size=obj["Size"],
+                last_modified=obj["LastModified"],
+                content_type=obj.get("ContentType"),
+            )
+            for obj in self._iter_objects(prefix)
+        ]
 
     def get_file_info(self, key: str) -> StorageFile | None:
         """Get file metadata from S3."""
-        from botocore.exceptions import BotoCoreError, ClientError
-
         try:
             response = self.client.head_object(Bucket=self.bucket, Key=self._full_key(key))
             return StorageFile(
@@ -275,6 +551,195 @@ class S3Storage(StorageBackend):
         except (BotoCoreError, ClientError):
             return None
 
+    def delete_older_than(self, prefix: str, max_age: timedelta) -> list[str]:
+        """Delete files older than max_age, up to S3_DELETE_BATCH_SIZE keys per request.
+
+        Listing entries are filtered as they stream in, so no StorageFile is
+        built for objects that are kept.
+        """
+        deleted = []
+        cutoff = datetime.now(timezone.utc) - max_age
+        batch = []
+        for obj in self._iter_objects(prefix):
+            if obj["LastModified"] >= cutoff:
+                continue
+            batch.append(obj["Key"])
+            if len(batch) == S3_DELETE_BATCH_SIZE:
+                deleted.extend(self._delete_batch(batch))
+                batch = []
+        if batch:
+            deleted.extend(self._delete_batch(batch))
+        return deleted
+
+    def _delete_batch(self, full_keys: list[str]) -> list[str]:
+        """Delete full S3 keys in one DeleteObjects call; returns the relative keys deleted."""
+        response = self.client.delete_objects(
+            Bucket=self.bucket,
+            Delete={"Objects": [{"Key": key} for key in full_keys], "Quiet": True},
+        )
+        failed = set()
+        for error in response.get("Errors", []):
+            failed.add(error["Key"])
+            logger.error(f"Failed to delete {error['Key']}: {error.get('Message')}")
+        deleted = []
+        for full_key in full_keys:
+            if full_key not in failed:
+                key = self._relative_key(full_key)
+                deleted.append(key)
+                logger.info(f"Deleted expired file: {key}")
+        return deleted
+
+
+class CachingStorage(StorageBackend):
+    """Read-through disk cache in front of another backend, typically S3.
+
+    Stored files are never rewritten, so a cached copy stays valid until its
+    key is deleted. The first read of a key downloads the whole object into
+    cache_dir; later reads are served from local disk, seekable, so Range
+    requests work too. Writes and metadata calls go to the inner backend.
+
+    Every worker process shares cache_dir, so the max_bytes limit is enforced
+    by measuring the directory after each download, evicting the least
+    recently read files (by mtime, refreshed on every hit) until it fits.
+    """
+
+    def __init__(self, inner: StorageBackend, cache_dir: str, max_bytes: int):
+        self.inner = inner
+        self.deduplicates = inner.deduplicates
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        os.makedirs(cache_dir, exist_ok=True)
+        self._lock = threading.Lock()
+        self._sweep_temp_files()
+        self._evict()
+
+    def _cache_name(self, key: str) -> str:
+        """File name for a key; hashed so any key maps to one flat, safe name."""
+        return hashlib.sha256(key.encode()).hexdigest()
+
+    def _sweep_temp_files(self) -> None:
+        """Remove partial downloads left behind by a crashed worker."""
+        cutoff = time.time() - CACHE_TEMP_MAX_AGE
+        with os.scandir(self.cache_dir) as entries:
+            for entry in entries:
+                try:
+                    if entry.name.endswith(".tmp") and entry.stat().st_mtime < cutoff:
+                        os.remove(entry.path)
+                except FileNotFoundError:
+                    continue
+
+    def _touch(self, name: str) -> None:
+        """Mark a cache file as just read; eviction goes by mtime."""
+        now = time.time_ns()
+        try:
+            os.utime(os.path.join(self.cache_dir, name), ns=(now, now))
+        except FileNotFoundError:
+            pass
+
+    def _evict(self) -> None:
+        """Delete the least recently read cache files until the directory fits max_bytes."""
+        with self._lock:
+            files = []
+            total = 0
+            with os.scandir(self.cache_dir) as entries:
+                for entry in entries:
+                    if entry.name.endswith(".tmp"):
+                        continue
+                    try:
+                        stat = entry.stat()
+                    except FileNotFoundError:
+                        continue
+                    files.append((stat.st_mtime_ns, stat.st_size, entry.name))
+                    total += stat.st_size
+            if total <= self.max_bytes:
+                return
+            for _, size, name in sorted(files):
+                self._remove(name)
+                total -= size
+                if total <= self.max_bytes:
+                    break
+
+    def _forget(self, key: str) -> None:
+        self._remove(self._cache_name(key))
+
+    def _remove(self, name: str) -> None:
+        try:
+            os.remove(os.path.join(self.cache_dir, name))
+        except FileNotFoundError:
+            pass
+
+    def _fill(self, key: str, name: str) -> BinaryIO:
+        """Download key into the cache and return it open for reading."""
+        fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                self.inner.read_into(key, f)
+            # Ranged downloads write out of order, so the size comes from the file
+            size = os.path.getsize(tmp_path)
+            stream = open(tmp_path, "rb")
+            if size <= self.max_bytes:
+                os.replace(tmp_path, os.path.join(self.cache_dir, name))
+                self._touch(name)
+                self._evict()
+        finally:
+            # Too large to cache: the open handle outlives the unlinked file
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+        return stream
+
+    def save(self, key: str, data: bytes, content_type: str | None = None) -> None:
+        """Save data to the inner backend."""
+        self.inner.save(key, data, content_type)
+
+    def save_stream(
+        self,
+        key: str,
+        stream: BinaryIO,
+        content_type: str | None = None,
+        content_digest: Callable[[], str] | None = None,
+    ) -> None:
+        """Stream data to the inner backend."""
+        self.inner.save_stream(key, stream, content_type, content_digest)
+
+    def read(self, key: str) -> bytes:
+        """Read data, from the cache when present."""
+        with self.open(key) as f:
+            return f.read()
+
+    def open(self, key: str) -> BinaryIO:
+        """Open a cached copy of a key, downloading it on a miss."""
+        name = self._cache_name(key)
+        try:
+            stream = open(os.path.join(self.cache_dir, name), "rb")
+        except FileNotFoundError:
+            return self._fill(key, name)
+        self._touch(name)
+        return stream
+
+    def delete(self, key: str) -> bool:
+        """Delete a file from the inner backend and drop its cached copy."""
+        self._forget(key)
+        return self.inner.delete(key)
+
+    def exists(self, key: str) -> bool:
+        """Check if a file exists in the inner backend."""
+        return self.inner.exists(key)
+
+    def list_files(self, prefix: str = "") -> list[StorageFile]:
+        """List files in the inner backend."""
+        return self.inner.list_files(prefix)
+
+    def get_file_info(self, key: str) -> StorageFile | None:
+        """Get file metadata from the inner backend."""
+        return self.inner.get_file_info(key)
+
+    def delete_older_than(self, prefix: str, max_age: timedelta) -> list[str]:
+        """Expire files in the inner backend and drop their cached copies."""
+        deleted = self.inner.delete_older_than(prefix, max_age)
+        for key in deleted:
+            self._forget(key)
+        return deleted
+
 
 def create_storage_backend(storage_type: str | None = None, **kwargs) -> StorageBackend:
     """
@@ -292,6 +757,8 @@ def create_storage_backend(storage_type: str | None = None, **kwargs) -> Storage
         SPACES_ACCESS_KEY: Access key ID
         SPACES_SECRET_KEY: Secret access key
         SPACES_PREFIX: Optional prefix for all keys (e.g., "uploads")
+        STORAGE_CACHE_DIR: Local directory caching S3 reads (default: no cache)
+        STORAGE_CACHE_MAX_BYTES: Size limit of that cache (default: 1 GiB)
         UPLOAD_FOLDER: Local folder path (for local storage)
     """
     if storage_type is None:
@@ -302,7 +769,7 @@ def create_storage_backend(storage_type: str | None = None, **kwargs) -> Storage
         if not bucket:
             raise ValueError("S3 storage requires SPACES_BUCKET environment variable")
 
-        return S3Storage(
+        storage = S3Storage(
             bucket=bucket,
             endpoint_url=kwargs.get("endpoint_url") or os.getenv("SPACES_ENDPOINT"),
             region=kwargs.get("region") or os.getenv("SPACES_REGION"),
@@ -310,6 +777,11 @@ def create_storage_backend(storage_type: str | None = None, **kwargs) -> Storage
             secret_key=kwargs.get("secret_key") or os.getenv("SPACES_SECRET_KEY"),
             prefix=kwargs.get("prefix") or os.getenv("SPACES_PREFIX", ""),
         )
+        cache_dir = kwargs.get("cache_dir") or os.getenv("STORAGE_CACHE_DIR")
+        if cache_dir:
+            max_bytes = int(os.getenv("STORAGE_CACHE_MAX_BYTES", DEFAULT_CACHE_MAX_BYTES))
+            return CachingStorage(storage, cache_dir, max_bytes)
+        return storage
     else:
         base_path = kwargs.get("base_path") or os.getenv("UPLOAD_FOLDER", "uploads")
         return LocalStorage(base_path=base_path)
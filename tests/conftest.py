@@ -2,10 +2,14 @@
 
 import os
 import tempfile
+from contextlib import contextmanager
 
 import pytest
+from sqlalchemy import event
 
 from clipdrop.app import create_app
+from clipdrop.extensions import db
+from clipdrop.models import User
 
 
 @pytest.fixture
@@ -20,10 +24,12 @@ def app():
 
         # Set environment variables for testing
         os.environ["SECRET_KEY"] = "test-secret-key-for-testing"
+        os.environ["UPLOAD_FOLDER"] = upload_folder
 
         app = create_app(
             config={
                 "TESTING": True,
+                "SQLALCHEMY_DATABASE_URI": "sqlite://",
                 "UPLOAD_FOLDER": upload_folder,
                 "CLIPBOARD_FOLDER": clipboard_folder,
             }
@@ -38,6 +44,44 @@ def client(app):
     return app.test_client()
 
 
+@pytest.fixture
+def auth_client(app, client):
+    """Create test client logged in as a GitHub user."""
+    with app.app_context():
+        user = User(github_id="12345", username="tester")
+        db.session.add(user)
+        db.session.commit()
+        user_id = user.id
+
+    with client.session_transaction() as session:
+        session["_user_id"] = str(user_id)
+        session["_fresh"] = True
+
+    return client
+
+
+@pytest.fixture
+def count_queries(app):
+    """Collect the SQL statements run inside ``with count_queries() as queries:``."""
+
+    @contextmanager
+    def counter():
+        with app.app_context():
+            engine = db.engine
+        statements = []
+
+        def record(conn, cursor, statement, parameters, context, executemany):
+            statements.append(statement)
+
+        event.listen(engine, "before_cursor_execute", record)
+        try:
+            yield statements
+        finally:
+            event.remove(engine, "before_cursor_execute", record)
+
+    return counter
+
+
 @pytest.fixture
 def runner(app):
     """Create test CLI runner."""
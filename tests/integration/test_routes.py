@@ -1,6 +1,9 @@
 """Integration tests for Flask routes."""
 
 import io
+import os
+
+import pytest
 
 
 class TestIndexRoute:
@@ -95,3 +98,509 @@ class TestFileNotFound:
         """Should return 404 for nonexistent clipboard raw file."""
         response = client.get("/clipboard/raw/nonexistent.txt")
         assert response.status_code == 404
+
+
+class TestGitHubAccountLookup:
+    """Tests for loading a GitHub user together with their OAuth link."""
+
+    def test_find_github_account(self, app, auth_client):
+        from clipdrop.app import find_github_account
+        from clipdrop.extensions import db
+        from clipdrop.models import OAuth, User
+
+        with app.app_context():
+            user = User.query.one()
+            assert find_github_account("github", "12345") == (user, None)
+            assert find_github_account("github", "999") == (None, None)
+
+            oauth = OAuth(provider="github", provider_user_id="12345", token={}, user=user)
+            db.session.add(oauth)
+            db.session.commit()
+
+            assert find_github_account("github", "12345") == (user, oauth)
+
+    def test_save_github_account_upserts(self, app, auth_client):
+        from clipdrop.app import save_github_account
+        from clipdrop.models import OAuth, User
+
+        with app.app_context():
+            created = save_github_account("github", "777", "octo", None, {"access_token": "a"})
+            updated = save_github_account(
+                "github", "777", "octocat", "avatar", {"access_token": "b"}
+            )
+
+            assert created.id == updated.id
+            assert (updated.username, updated.avatar_url) == ("octocat", "avatar")
+            oauth = OAuth.query.filter_by(provider_user_id="777").one()
+            assert (oauth.user_id, oauth.token) == (updated.id, {"access_token": "b"})
+            assert User.query.count() == 2
+
+
+class TestClipboardTags:
+    """Tests for tag lookup and creation."""
+
+    def test_get_or_create_tags_is_idempotent(self, app, auth_client):
+        from clipdrop.app import get_or_create_tags
+        from clipdrop.models import ClipboardTag, User
+
+        with app.app_context():
+            user_id = User.query.one().id
+            first = get_or_create_tags(["work", "todo"], user_id)
+            second = get_or_create_tags(["todo", "later"], user_id)
+
+            assert sorted(tag.name for tag in first) == ["todo", "work"]
+            assert sorted(tag.name for tag in second) == ["later", "todo"]
+            assert ClipboardTag.query.count() == 3
+
+    def test_parse_tag_names(self):
+        from clipdrop.app import parse_tag_names
+
+        assert parse_tag_names(" Work , todo,, WORK ,  , to do ") == ["work", "todo", "to do"]
+        assert parse_tag_names(" , ") == []
+
+    def test_serialize_clipboard_items_includes_tags(self, app, auth_client):
+        from clipdrop.app import get_or_create_tags, serialize_clipboard_items
+        from clipdrop.extensions import db
+        from clipdrop.models import ClipboardItem, User
+
+        with app.app_context():
+            user_id = User.query.one().id
+            item = ClipboardItem(
+                user_id=user_id,
+                name="note.txt",
+                content=b"hello",
+                content_type="text/plain",
+                size=5,
+                tags=get_or_create_tags(["work"], user_id),
+            )
+            db.session.add(item)
+            db.session.commit()
+            db.session.expunge_all()
+
+            (data,) = serialize_clipboard_items(ClipboardItem.query.filter_by(user_id=user_id))
+
+            assert data["name"] == "note.txt"
+            assert data["tags"] == ["work"]
+
+    def test_listing_uses_text_preview(self, app, auth_client):
+        from clipdrop.app import serialize_clipboard_items
+        from clipdrop.models import ClipboardItem
+
+        app.config["ENCRYPTION_KEY"] = os.urandom(32)
+        auth_client.post("/clipboard", data={"clipboard_data": "short"})
+        auth_client.post("/clipboard", data={"clipboard_data": "x" * 2000})
+
+        with app.test_request_context():
+            items = serialize_clipboard_items(ClipboardItem.query.order_by(ClipboardItem.size))
+
+        assert [(item["content"], item["truncated"]) for item in items] == [
+            ("short", False),
+            ("x" * 512, True),
+        ]
+        assert auth_client.get("/shared-clipboard").data.count(b"data-raw-url") == 1
+
+
+class TestClipboardCleanup:
+    """Tests for expired clipboard item cleanup."""
+
+    def test_delete_expired_clipboard_items(self, app, auth_client):
+        from datetime import datetime, timedelta
+
+        from clipdrop.app import delete_expired_clipboard_items, get_or_create_tags
+        from clipdrop.extensions import db
+        from clipdrop.models import ClipboardItem, User, clipboard_item_tags
+
+        now = datetime.utcnow()
+        with app.app_context():
+            user_id = User.query.one().id
+            tags = get_or_create_tags(["old"], user_id)
+
+            def make_item(name, expires_at):
+                return ClipboardItem(
+                    user_id=user_id,
+                    name=name,
+                    content=b"x",
+                    content_type="text/plain",
+                    size=1,
+                    expires_at=expires_at,
+                    tags=tags,
+                )
+
+            db.session.add_all(
+                [
+                    make_item("expired.txt", now - timedelta(hours=1)),
+                    make_item("fresh.txt", now + timedelta(hours=1)),
+                    make_item("kept.txt", None),
+                ]
+            )
+            db.session.commit()
+
+            assert delete_expired_clipboard_items(now) == 1
+            names = sorted(item.name for item in ClipboardItem.query.all())
+            assert names == ["fresh.txt", "kept.txt"]
+            links = db.session.execute(clipboard_item_tags.select()).all()
+            assert len(links) == 2
+
+
+class TestClipboardRaw:
+    """Tests for raw clipboard downloads."""
+
+    def test_raw_download_revalidates_with_etag(self, app, auth_client):
+        from clipdrop.extensions import db
+        from clipdrop.models import ClipboardItem, User
+
+        with app.app_context():
+            item = ClipboardItem(
+                user_id=User.query.one().id,
+                name="note.txt",
+                content=b"hello",
+                content_type="text/plain",
+                size=5,
+            )
+            db.session.add(item)
+            db.session.commit()
+            item_id = item.id
+
+        response = auth_client.get(f"/clipboard/{item_id}/raw")
+        assert response.data == b"hello"
+        assert response.content_length == 5
+        assert response.headers["Content-Disposition"] == "inline; filename=note.txt"
+        etag = response.headers["ETag"]
+
+        response = auth_client.get(f"/clipboard/{item_id}/raw", headers={"If-None-Match": etag})
+        assert response.status_code == 304
+        assert response.data == b""
+
+
+class TestFolderOptions:
+    """Tests for the folder select options."""
+
+    def test_build_folder_options_orders_depth_first(self, app, auth_client):
+        from clipdrop.app import build_folder_options
+        from clipdrop.extensions import db
+        from clipdrop.models import ClipboardFolder, User
+
+        with app.test_request_context():
+            user_id = User.query.one().id
+            work = ClipboardFolder(user_id=user_id, name="work")
+            archive = ClipboardFolder(user_id=user_id, name="Archive")
+            db.session.add_all([work, archive])
+            db.session.flush()
+            db.session.add_all(
+                [
+                    ClipboardFolder(user_id=user_id, name="reports", parent_id=work.id),
+                    ClipboardFolder(user_id=user_id, name="Drafts", parent_id=work.id),
+                ]
+            )
+            db.session.commit()
+
+            labels = [option["label"] for option in build_folder_options(user_id)]
+
+            assert labels == ["Archive", "work", "- Drafts", "- reports"]
+            assert build_folder_options(user_id) is build_folder_options(user_id)
+
+    def test_folder_options_endpoint_revalidates(self, app, auth_client):
+        from clipdrop.extensions import db
+        from clipdrop.models import ClipboardFolder, User
+
+        with app.app_context():
+            user_id = User.query.one().id
+            db.session.add(ClipboardFolder(user_id=user_id, name="work"))
+            db.session.commit()
+
+        response = auth_client.get("/clipboard/folder-options.json")
+        assert [folder["label"] for folder in response.get_json()["folders"]] == ["work"]
+        etag = response.headers["ETag"]
+
+        response = auth_client.get(
+            "/clipboard/folder-options.json", headers={"If-None-Match": etag}
+        )
+        assert response.status_code == 304
+
+        with app.app_context():
+            db.session.add(ClipboardFolder(user_id=user_id, name="home"))
+            db.session.commit()
+
+        response = auth_client.get(
+            "/clipboard/folder-options.json", headers={"If-None-Match": etag}
+        )
+        assert response.status_code == 200
+        assert [folder["label"] for folder in response.get_json()["folders"]] == ["home", "work"]
+
+
+def stored_uploads(folder):
+    """Names of uploaded files, ignoring the content store and scheduler lock."""
+    return [
+        entry.name
+        for entry in os.scandir(folder)
+        if entry.is_file() and not entry.name.startswith(".")
+    ]
+
+
+class NonSeekableFileWrapper:
+    """wsgi.file_wrapper without seek support, like gunicorn's."""
+
+    def __init__(self, filelike, blksize=8192):
+        self.filelike = filelike
+        self.blksize = blksize
+
+    def __iter__(self):
+        while data := self.filelike.read(self.blksize):
+            yield data
+
+    def close(self):
+        self.filelike.close()
+
+
+class TestAuthenticatedFiles:
+    """Tests for upload and download as a signed-in user."""
+
+    def test_upload_then_download(self, auth_client, app):
+        """Uploaded content should be streamed to storage and served back."""
+        payload = b"streamed upload content" * 1000
+        response = auth_client.post(
+            "/",
+            data={"file": (io.BytesIO(payload), "notes.txt")},
+            content_type="multipart/form-data",
+            headers={"X-Requested-With": "XMLHttpRequest"},
+        )
+        assert response.status_code == 200
+
+        stored = stored_uploads(app.config["UPLOAD_FOLDER"])
+        assert len(stored) == 1
+        assert stored[0].endswith("_notes.txt")
+
+        response = auth_client.get(f"/uploads/{stored[0]}")
+        assert response.status_code == 200
+        assert response.data == payload
+
+    def test_download_via_x_accel_redirect(self, auth_client, app):
+        """With a redirect prefix configured, nginx should be told to serve the file."""
+        app.config["X_ACCEL_REDIRECT_PREFIX"] = "/_internal_uploads/"
+        auth_client.post(
+            "/",
+            data={"file": (io.BytesIO(b"plain"), "notes.txt")},
+            content_type="multipart/form-data",
+            headers={"X-Requested-With": "XMLHttpRequest"},
+        )
+        (stored,) = stored_uploads(app.config["UPLOAD_FOLDER"])
+
+        response = auth_client.get(f"/uploads/{stored}")
+
+        assert response.status_code == 200
+        assert response.headers["X-Accel-Redirect"] == f"/_internal_uploads/{stored}"
+        assert response.mimetype == "text/plain"
+        assert response.data == b""
+
+    def test_encrypted_upload_then_download(self, auth_client, app):
+        """Encrypted uploads should be stored as ciphertext and streamed back decrypted."""
+        app.config["ENCRYPTION_KEY"] = os.urandom(32)
+        payload = b"secret upload content" * 100000
+        auth_client.post(
+            "/",
+            data={"file": (io.BytesIO(payload), "secret.txt")},
+            content_type="multipart/form-data",
+            headers={"X-Requested-With": "XMLHttpRequest"},
+        )
+
+        (stored,) = stored_uploads(app.config["UPLOAD_FOLDER"])
+        with open(os.path.join(app.config["UPLOAD_FOLDER"], stored), "rb") as f:
+            assert f.read(len(payload)) != payload
+
+        response = auth_client.get(f"/uploads/{stored}")
+        assert response.status_code == 200
+        assert response.data == payload
+        assert "secret.txt" in response.headers["Content-Disposition"]
+
+    def test_encrypted_download_serves_ranges(self, auth_client, app):
+        """Range requests on encrypted uploads should return just the requested bytes."""
+        app.config["ENCRYPTION_KEY"] = os.urandom(32)
+        payload = bytes(range(256)) * 8192
+        auth_client.post(
+            "/",
+            data={"file": (io.BytesIO(payload), "video.zip")},
+            content_type="multipart/form-data",
+            headers={"X-Requested-With": "XMLHttpRequest"},
+        )
+        (stored,) = stored_uploads(app.config["UPLOAD_FOLDER"])
+
+        response = auth_client.get(f"/uploads/{stored}")
+        assert response.headers["Accept-Ranges"] == "bytes"
+        assert response.content_length == len(payload)
+
+        start = 1024 * 1024 - 10
+        response = auth_client.get(
+            f"/uploads/{stored}", headers={"Range": f"bytes={start}-{start + 19}"}
+        )
+        assert response.status_code == 206
+        assert response.data == payload[start : start + 20]
+        assert response.headers["Content-Range"] == f"bytes {start}-{start + 19}/{len(payload)}"
+
+        response = auth_client.get(
+            f"/uploads/{stored}", headers={"Range": f"bytes={len(payload)}-"}
+        )
+        assert response.status_code == 416
+
+    def test_encrypted_ranges_seek_with_a_non_seekable_file_wrapper(
+        self, auth_client, app, monkeypatch
+    ):
+        """Ranges should only decrypt the records they cover under gunicorn's file_wrapper."""
+        from clipdrop.crypto import RecordReader
+
+        app.config["ENCRYPTION_KEY"] = os.urandom(32)
+        payload = os.urandom(4 * 1024 * 1024)
+        auth_client.post(
+            "/",
+            data={"file": (io.BytesIO(payload), "video.zip")},
+            content_type="multipart/form-data",
+            headers={"X-Requested-With": "XMLHttpRequest"},
+        )
+        (stored,) = stored_uploads(app.config["UPLOAD_FOLDER"])
+        decrypted = []
+        decrypt_record = RecordReader._decrypt_record
+
+        def counting_decrypt(self, index):
+            decrypted.append(index)
+            return decrypt_record(self, index)
+
+        monkeypatch.setattr(RecordReader, "_decrypt_record", counting_decrypt)
+
+        start = len(payload) - 10
+        response = auth_client.get(
+            f"/uploads/{stored}",
+            headers={"Range": f"bytes={start}-"},
+            environ_base={"wsgi.file_wrapper": NonSeekableFileWrapper},
+        )
+
+        assert response.status_code == 206
+        assert response.data == payload[start:]
+        assert decrypted == [3]
+
+    def test_encrypted_download_revalidates_with_etag(self, auth_client, app):
+        """A matching If-None-Match should get a 304 without the file body."""
+        app.config["ENCRYPTION_KEY"] = os.urandom(32)
+        auth_client.post(
+            "/",
+            data={"file": (io.BytesIO(b"cache me"), "cached.txt")},
+            content_type="multipart/form-data",
+            headers={"X-Requested-With": "XMLHttpRequest"},
+        )
+        (stored,) = stored_uploads(app.config["UPLOAD_FOLDER"])
+
+        response = auth_client.get(f"/uploads/{stored}")
+        etag = response.headers["ETag"]
+        assert response.data == b"cache me"
+
+        response = auth_client.get(f"/uploads/{stored}", headers={"If-None-Match": etag})
+        assert response.status_code == 304
+        assert response.data == b""
+
+    def test_preview_returns_truncated_text(self, auth_client, app):
+        """Previews should decrypt only the start of a text upload."""
+        app.config["ENCRYPTION_KEY"] = os.urandom(32)
+        payload = b"line of text\n" * 2000
+        auth_client.post(
+            "/",
+            data={"file": (io.BytesIO(payload), "long.txt")},
+            content_type="multipart/form-data",
+            headers={"X-Requested-With": "XMLHttpRequest"},
+        )
+        (stored,) = stored_uploads(app.config["UPLOAD_FOLDER"])
+
+        data = auth_client.get(f"/uploads/{stored}/preview").get_json()
+
+        assert data["truncated"] is True
+        assert payload.decode().startswith(data["content"])
+        assert len(data["content"]) == 4 * 1024
+
+    def test_missing_file_preview_and_delete_return_404(self, auth_client):
+        """Missing uploads should 404 without a separate existence check."""
+        assert auth_client.get("/uploads/missing.txt/preview").status_code == 404
+        assert auth_client.post("/delete/missing.txt").status_code == 404
+
+    def test_preview_rejects_binary_types(self, auth_client):
+        """Non-text uploads should not be previewed."""
+        response = auth_client.get("/uploads/photo.png/preview")
+        assert response.status_code == 400
+
+
+class TestQueryBudgets:
+    """Upper bounds on queries per page, so N+1 patterns fail loudly."""
+
+    def add_items(self, auth_client, count):
+        for index in range(count):
+            auth_client.post(
+                "/clipboard",
+                data={"clipboard_data": f"item {index}", "tags": f"tag{index % 5}, shared"},
+            )
+
+    def test_shared_clipboard_query_budget(self, auth_client, count_queries):
+        self.add_items(auth_client, 50)
+
+        with count_queries() as queries:
+            response = auth_client.get("/shared-clipboard")
+
+        assert response.status_code == 200
+        assert len(queries) <= 4
+
+    def test_shared_clipboard_query_budget_without_previews(self, app, auth_client, count_queries):
+        """Items saved before text_preview existed should not load content one by one."""
+        from clipdrop.extensions import db
+        from clipdrop.models import ClipboardItem
+
+        self.add_items(auth_client, 30)
+        with app.app_context():
+            ClipboardItem.query.update({ClipboardItem.text_preview: None})
+            db.session.commit()
+
+        with count_queries() as queries:
+            response = auth_client.get("/shared-clipboard")
+
+        assert response.status_code == 200
+        assert b"item 29" in response.data
+        assert len(queries) <= 5
+
+    def test_edit_clipboard_item_query_budget(self, app, auth_client, count_queries):
+        from clipdrop.models import ClipboardItem
+
+        self.add_items(auth_client, 1)
+        with app.app_context():
+            item_id = ClipboardItem.query.one().id
+
+        with count_queries() as queries:
+            response = auth_client.get(f"/clipboard/{item_id}/edit")
+
+        assert response.status_code == 200
+        assert len(queries) <= 3
+
+    def test_favorite_toggle_skips_content(self, app, auth_client, count_queries):
+        from clipdrop.models import ClipboardItem
+
+        self.add_items(auth_client, 1)
+        with app.app_context():
+            item_id = ClipboardItem.query.one().id
+
+        with count_queries() as queries:
+            response = auth_client.post(f"/clipboard/{item_id}/favorite", json={})
+
+        assert response.status_code == 200
+        assert not any("clipboard_item.content " in query for query in queries)
+
+
+class TestSchedulerLock:
+    """Tests for electing the cleanup scheduler process."""
+
+    def test_lock_defaults_to_the_upload_folder(self, app):
+        assert app.config["SCHEDULER_LOCK_FILE"] == os.path.join(
+            app.config["UPLOAD_FOLDER"], ".scheduler.lock"
+        )
+
+    def test_unopenable_lock_file_does_not_block_startup(self, app, tmp_path):
+        pytest.importorskip("fcntl")
+        from clipdrop.app import acquire_scheduler_lock
+
+        app.extensions.pop("clipdrop_scheduler_lock", None)
+        app.config["SCHEDULER_LOCK_FILE"] = str(tmp_path)
+
+        assert acquire_scheduler_lock(app) is True
+        assert "clipdrop_scheduler_lock" not in app.extensions
@@ -1,14 +1,22 @@
 """Unit tests for crypto module."""
 
+import io
+
 import pytest
+from cryptography.exceptions import InvalidTag
 
 from clipdrop.crypto import (
     KEY_SIZE,
+    STREAM_MAGIC,
+    RecordReader,
     decrypt_data,
+    decrypt_stream,
     encrypt_data,
+    encrypt_stream,
     generate_key,
     generate_key_b64,
     is_likely_encrypted,
+    iter_chunks,
     load_key_from_env,
     safe_decrypt,
 )
@@ -111,6 +119,15 @@ class TestIsLikelyEncrypted:
         png_header = b"\x89PNG\r\n\x1a\n" + b"\x00" * 50
         assert is_likely_encrypted(png_header) is False
 
+    def test_utf8_text_cut_mid_character_not_encrypted(self):
+        """Non-ASCII text should still be recognised when the sniff window splits a character."""
+        text = ("a" * 1023 + "é" * 10).encode("utf-8")
+        assert is_likely_encrypted(text) is False
+
+    def test_control_bytes_look_encrypted(self):
+        """Leading control characters other than whitespace should not pass as text."""
+        assert is_likely_encrypted(b"\x01\x02" + b"a" * 40) is True
+
     def test_short_data_not_encrypted(self):
         """Data shorter than minimum encrypted size is not encrypted."""
         short_data = b"short"
@@ -140,3 +157,107 @@ class TestSafeDecrypt:
 
         assert result == plain_text
         assert was_encrypted is False
+
+
+class TestStreamEncryption:
+    """Tests for chunked streaming encryption/decryption."""
+
+    def test_stream_roundtrip(self):
+        """Streamed ciphertext should decrypt back to the original chunks."""
+        key = generate_key()
+        chunks = [b"first chunk ", b"", b"second", b" and a third chunk" * 100]
+
+        encrypted = list(encrypt_stream(chunks, key))
+        decrypted = b"".join(decrypt_stream(encrypted, key))
+
+        assert decrypted == b"".join(chunks)
+
+    def test_stream_output_matches_buffered_layout(self):
+        """Streamed and buffered encryption should be interchangeable."""
+        key = generate_key()
+        plaintext = b"interoperable payload" * 50
+
+        streamed = b"".join(encrypt_stream([plaintext], key))
+        assert decrypt_data(streamed, key) == plaintext
+
+        buffered = encrypt_data(plaintext, key)
+        assert b"".join(decrypt_stream([buffered], key)) == plaintext
+
+    def test_decrypt_stream_handles_small_chunks(self):
+        """Nonce and tag split across tiny chunks should still decrypt."""
+        key = generate_key()
+        plaintext = b"byte by byte"
+        encrypted = encrypt_data(plaintext, key)
+
+        pieces = [encrypted[i : i + 1] for i in range(len(encrypted))]
+
+        assert b"".join(decrypt_stream(pieces, key)) == plaintext
+
+    def test_decrypt_stream_with_wrong_key_fails(self):
+        """Tampered or foreign ciphertext should fail when the stream ends."""
+        encrypted = list(encrypt_stream([b"Secret message"], generate_key()))
+
+        with pytest.raises(InvalidTag):
+            b"".join(decrypt_stream(encrypted, generate_key()))
+
+    def test_decrypt_stream_too_short(self):
+        """Should raise ValueError when there is no room for nonce and tag."""
+        with pytest.raises(ValueError, match="too short"):
+            b"".join(decrypt_stream([b"short"], generate_key()))
+
+    def test_stream_records_roundtrip_at_chunk_boundaries(self):
+        """Empty, exact-multiple and ragged plaintexts should all round-trip."""
+        key = generate_key()
+        for plaintext in (b"", b"x" * 32, b"y" * 33, b"z" * 100):
+            encrypted = b"".join(encrypt_stream([plaintext], key, chunk_size=16))
+
+            assert encrypted.startswith(STREAM_MAGIC)
+            assert b"".join(decrypt_stream([encrypted], key)) == plaintext
+            assert decrypt_data(encrypted, key) == plaintext
+
+    def test_stream_records_detect_truncation(self):
+        """Dropping trailing records should fail instead of returning a prefix."""
+        key = generate_key()
+        records = list(encrypt_stream([b"a" * 64], key, chunk_size=16))
+
+        with pytest.raises(InvalidTag):
+            b"".join(decrypt_stream(records[:-1], key))
+
+    def test_stream_records_detect_reordering(self):
+        """Swapping records should fail authentication."""
+        key = generate_key()
+        header, first, second, *rest = encrypt_stream(
+            [b"a" * 16 + b"b" * 16 + b"c"], key, chunk_size=16
+        )
+
+        with pytest.raises(InvalidTag):
+            b"".join(decrypt_stream([header, second, first, *rest], key))
+
+    def test_record_reader_seeks_within_records(self):
+        """Reads from any offset should return the matching plaintext."""
+        key = generate_key()
+        for plaintext in (b"", b"x" * 32, bytes(range(100))):
+            encrypted = b"".join(encrypt_stream([plaintext], key, chunk_size=16))
+            reader = RecordReader(io.BytesIO(encrypted), key, len(encrypted))
+
+            assert reader.size == len(plaintext)
+            assert reader.read() == plaintext
+            for start, stop in ((0, 5), (15, 17), (30, 100), (99, 100)):
+                reader.seek(start)
+                assert reader.read(stop - start) == plaintext[start:stop]
+
+    def test_record_reader_detects_truncation(self):
+        """A stream cut at a record boundary should not authenticate."""
+        key = generate_key()
+        encrypted = b"".join(encrypt_stream([b"a" * 64], key, chunk_size=16))[:-32]
+        reader = RecordReader(io.BytesIO(encrypted), key, len(encrypted))
+
+        with pytest.raises(InvalidTag):
+            reader.seek(reader.size - 1)
+            reader.read()
+
+    def test_iter_chunks_reads_until_eof(self):
+        """iter_chunks should split a stream into fixed-size pieces."""
+        stream = io.BytesIO(b"abcdefghij")
+
+        assert list(iter_chunks(stream, chunk_size=4)) == [b"abcd", b"efgh", b"ij"]
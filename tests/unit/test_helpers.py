@@ -44,6 +44,20 @@ class TestJsonResponses:
             assert response.json["id"] == "abc123"
             assert response.json["name"] == "test"
 
+    def test_orjson_provider_matches_default_output(self, app):
+        pytest.importorskip("orjson")
+        from flask.json.provider import DefaultJSONProvider
+
+        from clipdrop.extensions import ORJSONProvider
+
+        payload = {"b": 1, "a": [None, True], "when": datetime(2024, 1, 2, 3, 4, 5)}
+        fast = ORJSONProvider(app)
+        default = DefaultJSONProvider(app)
+
+        assert fast.loads(fast.dumps(payload)) == default.loads(default.dumps(payload))
+        with app.app_context():
+            assert fast.response(payload).get_data() == default.response(payload).get_data()
+
 
 class TestEncryption:
     """Tests for unified encryption/decryption functions."""
@@ -155,6 +169,10 @@ class TestFileHelpers:
         assert human_readable_size(1024) == "1.0 KB"
         assert human_readable_size(1024 * 1024) == "1.0 MB"
         assert human_readable_size(1024 * 1024 * 1024) == "1.0 GB"
+        assert human_readable_size(0) == "0.0 B"
+        assert human_readable_size(1023) == "1023.0 B"
+        assert human_readable_size(1536) == "1.5 KB"
+        assert human_readable_size(2048 * 1024**5) == "2048.0 PB"
 
     def test_allowed_file(self):
         from clipdrop.helpers import allowed_file
@@ -163,3 +181,111 @@ class TestFileHelpers:
         assert allowed_file("image.png") is True
         assert allowed_file("script.exe") is False
         assert allowed_file("noextension") is False
+        assert allowed_file("ARCHIVE.TAR") is True
+        assert allowed_file("notes.txt.exe") is False
+        assert allowed_file("txt") is False
+
+    def test_is_stored_filename(self):
+        from clipdrop.helpers import is_stored_filename
+
+        assert is_stored_filename("01HZX3J5T6_report.pdf") is True
+        assert is_stored_filename("3f2c9a1e-0b7d-4c55-9a51-1e2f3a4b5c6d_notes.txt") is True
+        assert is_stored_filename("../../etc/passwd") is False
+        assert is_stored_filename("..") is False
+        assert is_stored_filename(".env") is False
+        assert is_stored_filename("résumé.pdf") is False
+        assert is_stored_filename("") is False
+
+    def test_truncated_upload_names_stay_retrievable(self):
+        from clipdrop.helpers import (
+            MAX_STORED_FILENAME_LENGTH,
+            is_stored_filename,
+            truncate_filename,
+        )
+
+        assert truncate_filename("short.pdf", 20) == "short.pdf"
+        assert truncate_filename("a_long_report.pdf", 10) == "a_long.pdf"
+        assert truncate_filename("no_extension_at_all", 5) == "no_ex"
+
+        prefix = "01HZX3J5T6ABCDEFGHJKMNPQRS_"
+        name = prefix + truncate_filename(
+            "x" * 300 + ".txt", MAX_STORED_FILENAME_LENGTH - len(prefix)
+        )
+        assert len(name) == MAX_STORED_FILENAME_LENGTH
+        assert name.endswith(".txt")
+        assert is_stored_filename(name) is True
+
+
+class TestStreamingHelpers:
+    """Tests for streaming encryption helpers."""
+
+    def test_chunk_reader_reads_across_chunks(self):
+        from clipdrop.helpers import ChunkReader
+
+        reader = ChunkReader([b"abc", b"", b"defg", b"h"])
+        assert reader.read(2) == b"ab"
+        assert reader.read(4) == b"c"
+        assert reader.read() == b"defgh"
+        assert reader.read(1) == b""
+
+    def test_prefetch_preserves_order(self):
+        from clipdrop.helpers import prefetch
+
+        chunks = [bytes([i]) * 10 for i in range(50)]
+        assert list(prefetch(iter(chunks), depth=2)) == chunks
+
+    def test_prefetch_reraises_producer_errors(self):
+        from clipdrop.helpers import prefetch
+
+        def failing():
+            yield b"ok"
+            raise OSError("client disconnected")
+
+        consumer = prefetch(failing())
+        assert next(consumer) == b"ok"
+        with pytest.raises(OSError, match="disconnected"):
+            next(consumer)
+
+    def test_encrypt_stream_safe_without_key(self):
+        import io
+
+        from clipdrop.helpers import encrypt_stream_safe
+
+        stream = io.BytesIO(b"plain")
+        assert encrypt_stream_safe(stream, None) is stream
+
+    def test_encrypt_stream_safe_with_key(self):
+        import io
+        import os
+
+        from clipdrop.helpers import decrypt_data_safe, encrypt_stream_safe
+
+        key = os.urandom(32)
+        data = b"streamed secret" * 1000
+        encrypted = encrypt_stream_safe(io.BytesIO(data), key).read()
+
+        assert encrypted != data
+        assert decrypt_data_safe(encrypted, key) == data
+
+    def test_decrypt_stream_safe_with_key(self):
+        import io
+        import os
+
+        from clipdrop.helpers import decrypt_stream_safe, encrypt_data_safe
+
+        key = os.urandom(32)
+        data = b"streamed download" * 1000
+        stream = io.BytesIO(encrypt_data_safe(data, key))
+
+        assert b"".join(decrypt_stream_safe(stream, key)) == data
+
+    def test_decrypt_stream_safe_legacy_plaintext(self):
+        import io
+        import os
+
+        from clipdrop.helpers import decrypt_stream_safe
+
+        data = b"legacy plaintext file written before encryption" * 100
+        chunks = decrypt_stream_safe(io.BytesIO(data), os.urandom(32))
+
+        assert b"".join(chunks) == data
@@ -0,0 +1,67 @@
+"""Unit tests for the clipboard ULID migration script."""
+
+import importlib.util
+from pathlib import Path
+
+import pytest
+from sqlalchemy import create_engine, text
+
+SCRIPT = Path(__file__).resolve().parents[2] / "scripts" / "migrate_clipboard_ulid.py"
+
+
+@pytest.fixture
+def migration():
+    spec = importlib.util.spec_from_file_location("migrate_clipboard_ulid", SCRIPT)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+class NamedCursor:
+    """Stand-in for a psycopg named cursor, which rejects executemany."""
+
+    def __init__(self, cursor):
+        self._cursor = cursor
+
+    def __getattr__(self, name):
+        return getattr(self._cursor, name)
+
+    def executemany(self, *args):
+        raise RuntimeError("executemany is not supported on a server-side cursor")
+
+
+@pytest.fixture
+def server_side_engine(monkeypatch):
+    """SQLite engine that behaves like a dialect with server-side cursors."""
+    engine = create_engine("sqlite://")
+    monkeypatch.setattr(engine.dialect, "supports_server_side_cursors", True)
+    context_cls = engine.dialect.execution_ctx_cls
+    monkeypatch.setattr(
+        context_cls,
+        "create_server_side_cursor",
+        lambda self: NamedCursor(self.create_default_cursor()),
+    )
+    return engine
+
+
+class TestMigrationStreaming:
+    """Streaming reads must not leak server-side cursors into later statements."""
+
+    def test_inserts_after_streaming_use_plain_cursors(self, migration, server_side_engine):
+        with server_side_engine.begin() as conn:
+            conn.execute(text("CREATE TABLE source (id INTEGER)"))
+            conn.execute(text("CREATE TABLE target (id INTEGER)"))
+            conn.execute(text("INSERT INTO source VALUES (1), (2), (3)"))
+
+            migration.insert_in_batches(
+                conn,
+                "INSERT INTO target (id) VALUES (:id)",
+                (
+                    {"id": row["id"] * 10}
+                    for row in migration.stream_rows(conn, "SELECT id FROM source")
+                ),
+            )
+
+            assert "stream_results" not in conn.get_execution_options()
+            rows = conn.execute(text("SELECT id FROM target ORDER BY id")).scalars().all()
+        assert rows == [10, 20, 30]
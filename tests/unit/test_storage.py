@@ -0,0 +1,281 @@
+"""Unit tests for storage backends."""
+
+import io
+import os
+import time
+from datetime import datetime, timedelta, timezone
+
+import pytest
+import ulid
+
+from clipdrop.storage import CachingStorage, LocalStorage, S3Storage, StorageBackend
+
+
+class TestLocalStorage:
+    """Tests for the local filesystem backend."""
+
+    def test_save_stream_roundtrip(self, tmp_path):
+        """Streamed writes should be readable back as bytes."""
+        storage = LocalStorage(str(tmp_path))
+        payload = b"x" * (3 * 1024 * 1024 + 7)
+
+        storage.save_stream("big.bin", io.BytesIO(payload))
+
+        assert storage.read("big.bin") == payload
+        assert storage.get_file_info("big.bin").size == len(payload)
+
+    def test_list_files_reflects_saves_and_deletes(self, tmp_path):
+        """Cached listings should be invalidated by writes through the backend."""
+        storage = LocalStorage(str(tmp_path))
+        storage.save("a.txt", b"aaa")
+        assert [f.key for f in storage.list_files()] == ["a.txt"]
+
+        storage.save("b.txt", b"bb")
+        assert sorted(f.key for f in storage.list_files()) == ["a.txt", "b.txt"]
+
+        storage.delete("a.txt")
+        assert [f.key for f in storage.list_files()] == ["b.txt"]
+
+    def test_list_files_skips_directories(self, tmp_path):
+        """Only regular files should be listed."""
+        (tmp_path / "nested").mkdir()
+        (tmp_path / "file.txt").write_bytes(b"data")
+        storage = LocalStorage(str(tmp_path))
+
+        files = storage.list_files()
+
+        assert [(f.key, f.size) for f in files] == [("file.txt", 4)]
+
+    def test_list_files_skips_dotfiles(self, tmp_path):
+        """Files like the scheduler lock should not be listed or swept."""
+        (tmp_path / ".scheduler.lock").write_bytes(b"")
+        os.utime(tmp_path / ".scheduler.lock", (0, 0))
+        storage = LocalStorage(str(tmp_path))
+
+        assert storage.list_files() == []
+        assert storage.delete_older_than("", timedelta(days=1)) == []
+        assert (tmp_path / ".scheduler.lock").exists()
+
+    def test_delete_older_than(self, tmp_path):
+        """Only files older than max_age should be removed."""
+        storage = LocalStorage(str(tmp_path))
+        storage.save("fresh.txt", b"new")
+        (tmp_path / "nested").mkdir()
+
+        assert storage.delete_older_than("", timedelta(days=1)) == []
+        assert storage.delete_older_than("", timedelta(seconds=-1)) == ["fresh.txt"]
+        assert storage.list_files() == []
+        assert (tmp_path / "nested").is_dir()
+
+    def test_generic_delete_older_than(self, tmp_path):
+        """The listing-based default sweep should agree with the scandir one."""
+        storage = LocalStorage(str(tmp_path))
+        storage.save("fresh.txt", b"new")
+
+        assert StorageBackend.delete_older_than(storage, "", timedelta(days=1)) == []
+        assert StorageBackend.delete_older_than(storage, "", timedelta(seconds=-1)) == ["fresh.txt"]
+
+    def test_save_stream_deduplicates_identical_content(self, tmp_path):
+        """Uploads with the same digest should share one blob on disk."""
+        storage = LocalStorage(str(tmp_path))
+
+        storage.save_stream("a.bin", io.BytesIO(b"same"), content_digest=lambda: "ab12cd")
+        storage.save_stream("b.bin", io.BytesIO(b"same"), content_digest=lambda: "ab12cd")
+
+        assert (tmp_path / "a.bin").stat().st_ino == (tmp_path / "b.bin").stat().st_ino
+        assert sorted(f.key for f in storage.list_files()) == ["a.bin", "b.bin"]
+
+        storage.delete("a.bin")
+        assert storage.read("b.bin") == b"same"
+
+    def test_ulid_keys_keep_their_upload_time(self, tmp_path):
+        """Linking a duplicate should not move an earlier key's time or expiry."""
+        storage = LocalStorage(str(tmp_path))
+        uploaded = datetime.now(timezone.utc) - timedelta(days=2)
+        old_key = f"{ulid.from_timestamp(uploaded)}_a.bin"
+        new_key = f"{ulid.new()}_b.bin"
+        storage.save_stream(old_key, io.BytesIO(b"same"), content_digest=lambda: "ab12cd")
+        storage.save_stream(new_key, io.BytesIO(b"same"), content_digest=lambda: "ab12cd")
+
+        info = storage.get_file_info(old_key)
+        assert abs(info.last_modified - uploaded) < timedelta(milliseconds=1)
+        assert storage.delete_older_than("", timedelta(days=1)) == [old_key]
+        assert storage.read(new_key) == b"same"
+
+    def test_deduplicated_saves_keep_the_default_file_mode(self, tmp_path):
+        """Blob-backed uploads should get the same permissions as plain writes."""
+        storage = LocalStorage(str(tmp_path))
+        storage.save_stream("plain.bin", io.BytesIO(b"data"))
+        storage.save_stream("dedup.bin", io.BytesIO(b"data"), content_digest=lambda: "ab12cd")
+
+        plain_mode = (tmp_path / "plain.bin").stat().st_mode
+        assert (tmp_path / "dedup.bin").stat().st_mode == plain_mode
+
+    def test_save_stream_survives_a_concurrent_prune(self, tmp_path, monkeypatch):
+        """A cleanup run in the middle of an upload should not take its blob."""
+        storage = LocalStorage(str(tmp_path))
+        link = os.link
+
+        def prune_then_link(src, dst):
+            storage._prune_content_store(time.time() - 60)
+            link(src, dst)
+
+        monkeypatch.setattr(os, "link", prune_then_link)
+        storage.save_stream("a.bin", io.BytesIO(b"data"), content_digest=lambda: "ab12cd")
+        monkeypatch.undo()
+
+        assert storage.read("a.bin") == b"data"
+        assert (tmp_path / ".store" / "ab" / "12" / "ab12cd").stat().st_nlink == 2
+
+    def test_delete_older_than_prunes_unreferenced_blobs(self, tmp_path):
+        """Blobs should be removed once no key links to them."""
+        storage = LocalStorage(str(tmp_path))
+        storage.save_stream("a.bin", io.BytesIO(b"data"), content_digest=lambda: "ab12cd")
+        blob = tmp_path / ".store" / "ab" / "12" / "ab12cd"
+
+        storage.delete_older_than("", timedelta(days=1))
+        assert blob.exists()
+
+        storage.delete("a.bin")
+        storage.delete_older_than("", timedelta(days=1))
+        assert not blob.exists()
+
+
+class TestCachingStorage:
+    """Tests for the read-through disk cache."""
+
+    def test_reads_are_served_from_cache(self, tmp_path):
+        """A cached key should still read after the inner copy is gone."""
+        inner = LocalStorage(str(tmp_path / "inner"))
+        storage = CachingStorage(inner, str(tmp_path / "cache"), max_bytes=1024)
+        storage.save("a.bin", b"data")
+
+        assert storage.read("a.bin") == b"data"
+        inner.delete("a.bin")
+        with storage.open("a.bin") as f:
+            f.seek(2)
+            assert f.read() == b"ta"
+
+        storage.delete("a.bin")
+        assert list((tmp_path / "cache").iterdir()) == []
+
+    def test_least_recently_read_files_are_evicted(self, tmp_path):
+        """The cache should stay under max_bytes, dropping the oldest reads first."""
+        inner = LocalStorage(str(tmp_path / "inner"))
+        storage = CachingStorage(inner, str(tmp_path / "cache"), max_bytes=10)
+        for key in ("a", "b", "c"):
+            storage.save(key, key.encode() * 4)
+
+        storage.read("a")
+        storage.read("b")
+        storage.read("a")
+        storage.read("c")
+
+        inner.delete("a")
+        inner.delete("b")
+        assert storage.read("a") == b"aaaa"
+        with pytest.raises(FileNotFoundError):
+            storage.read("b")
+        assert storage.read("c") == b"cccc"
+
+    def test_limit_covers_caches_sharing_a_directory(self, tmp_path):
+        """Worker processes share cache_dir, so max_bytes applies to all of them."""
+        inner = LocalStorage(str(tmp_path / "inner"))
+        workers = [CachingStorage(inner, str(tmp_path / "cache"), max_bytes=10) for _ in range(2)]
+        for key in ("a", "b", "c", "d"):
+            inner.save(key, key.encode() * 4)
+
+        for i, key in enumerate(("a", "b", "c", "d")):
+            workers[i % 2].read(key)
+
+        cached = list((tmp_path / "cache").iterdir())
+        assert sum(f.stat().st_size for f in cached) <= 10
+
+    def test_abandoned_downloads_are_swept(self, tmp_path):
+        """Old temp files from a crashed download should be removed on startup."""
+        cache = tmp_path / "cache"
+        cache.mkdir()
+        (cache / "stale.tmp").write_bytes(b"partial")
+        os.utime(cache / "stale.tmp", (0, 0))
+        (cache / "active.tmp").write_bytes(b"partial")
+
+        CachingStorage(LocalStorage(str(tmp_path / "inner")), str(cache), max_bytes=1024)
+
+        assert [f.name for f in cache.iterdir()] == ["active.tmp"]
+
+    def test_files_larger_than_the_cache_are_not_kept(self, tmp_path):
+        """Oversized files should be readable but leave nothing in the cache."""
+        inner = LocalStorage(str(tmp_path / "inner"))
+        storage = CachingStorage(inner, str(tmp_path / "cache"), max_bytes=4)
+        storage.save("big.bin", b"x" * 8)
+
+        assert storage.read("big.bin") == b"x" * 8
+        assert list((tmp_path / "cache").iterdir()) == []
+
+
+class TestS3Storage:
+    """Tests for the S3 backend against a stubbed client."""
+
+    def test_delete_older_than_batches_deletes(self):
+        """Expired keys from a listing page should go out in one DeleteObjects call."""
+        stub = pytest.importorskip("botocore.stub")
+        storage = S3Storage(
+            "bucket", region="us-east-1", access_key="a", secret_key="b", prefix="uploads"
+        )
+        now = datetime.now(timezone.utc)
+        old = now - timedelta(days=2)
+        stubber = stub.Stubber(storage.client)
+        stubber.add_response(
+            "list_objects_v2",
+            {
+                "Contents": [
+                    {"Key": "uploads/a.bin", "LastModified": old, "Size": 1},
+                    {"Key": "uploads/b.bin", "LastModified": now, "Size": 1},
+                    {"Key": "uploads/c.bin", "LastModified": old, "Size": 1},
+                ]
+            },
+            {"Bucket": "bucket", "Prefix": "uploads"},
+        )
+        stubber.add_response(
+            "delete_objects",
+            {"Errors": [{"Key": "uploads/c.bin", "Code": "AccessDenied", "Message": "denied"}]},
+            {
+                "Bucket": "bucket",
+                "Delete": {
+                    "Objects": [{"Key": "uploads/a.bin"}, {"Key": "uploads/c.bin"}],
+                    "Quiet": True,
+                },
+            },
+        )
+
+        with stubber:
+            deleted = storage.delete_older_than("", timedelta(days=1))
+
+        assert deleted == ["a.bin"]
+        stubber.assert_no_pending_responses()
+
+    def test_delete_reports_missing_keys(self):
+        """Deleting an absent object should return False without a DeleteObject call."""
+        stub = pytest.importorskip("botocore.stub")
+        storage = S3Storage("bucket", region="us-east-1", access_key="a", secret_key="b")
+        stubber = stub.Stubber(storage.client)
+        stubber.add_client_error("head_object", "404", http_status_code=404)
+        stubber.add_response(
+            "head_object", {"ContentLength": 1}, {"Bucket": "bucket", "Key": "a.bin"}
+        )
+        stubber.add_response("delete_object", {}, {"Bucket": "bucket", "Key": "a.bin"})
+
+        with stubber:
+            assert storage.delete("missing.bin") is False
+            assert storage.delete("a.bin") is True
+        stubber.assert_no_pending_responses()
+
+    def test_read_into_maps_missing_keys(self):
+        """A missing object should surface as FileNotFoundError."""
+        stub = pytest.importorskip("botocore.stub")
+        storage = S3Storage("bucket", region="us-east-1", access_key="a", secret_key="b")
+        stubber = stub.Stubber(storage.client)
+        stubber.add_client_error("head_object", "404", http_status_code=404)
+
+        with stubber, pytest.raises(FileNotFoundError):
+            storage.read_into("missing.bin", io.BytesIO())